@@ -0,0 +1,145 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Deque, List, Set
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+
+
+def audit_buffered() -> bool:
+    """Whether audit records go through the buffered writer (AUDIT_WRITE_MODE=buffered)"""
+    return settings.AUDIT_WRITE_MODE == "buffered"
+
+
+def audit_record(
+    user_id: str,
+    entity_type: str,
+    entity_id: str,
+    action: str,
+    previous_status: str,
+    new_status: str
+) -> dict:
+    """Build an audit_log row for a status change, stamped with the time of the change"""
+    return {
+        "user_id": user_id,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "previous_value": {"status": previous_status},
+        "new_value": {"status": new_status},
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def maintain_audit_log() -> None:
+    """
+    Create upcoming monthly audit_log partitions and apply retention
+
+    Partitions older than AUDIT_RETENTION_MONTHS are dropped, after being
+    folded into audit_log_summary when AUDIT_RETENTION_SUMMARIZE is set.
+    """
+    supabase = get_supabase()
+    response = await execute(supabase.rpc("maintain_audit_log", {
+        "p_retain_months": settings.AUDIT_RETENTION_MONTHS,
+        "p_summarize": settings.AUDIT_RETENTION_SUMMARIZE
+    }))
+    if response.data:
+        print(f"Compacted {response.data} audit log partition(s)")
+
+
+class AuditWriter:
+    """
+    Bounded in-process buffer of audit_log rows, inserted in batches
+
+    Records are flushed in the background as soon as a full batch is
+    queued, periodically (scheduled on startup) and on shutdown. The buffer
+    never holds more than max_size records: a state change reserves room
+    for its audit rows with slots() before it is made, and when the buffer
+    is full (flushes failing or behind) its rows are written by the same
+    statement as the change instead (p_write_audit). record() never waits
+    for or fails on a flush, since it runs after the state change has
+    committed; failed batches are retried by the next flush. Records still
+    buffered when a worker dies are lost; use AUDIT_WRITE_MODE=sync where
+    that is not acceptable.
+    """
+
+    def __init__(self, max_size: int, batch_size: int):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self._buffer: Deque[dict] = deque()
+        self._reserved = 0
+        self._in_flight = 0
+        self._lock = asyncio.Lock()
+        self._flushes: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @asynccontextmanager
+    async def slots(self, count: int) -> AsyncIterator[bool]:
+        """
+        Reserve room for the audit rows of up to `count` changes
+
+        Yields:
+            True if the rows may be queued with record() inside the block,
+            False if they must be written synchronously (not buffered, or
+            the buffer is full)
+        """
+        if not audit_buffered() or len(self._buffer) + self._in_flight + self._reserved + count > self.max_size:
+            if audit_buffered():
+                print(f"Audit log buffer is full ({self.max_size} records); writing audit rows synchronously")
+            yield False
+            return
+
+        self._reserved += count
+        try:
+            yield True
+        finally:
+            self._reserved -= count
+
+    async def record(self, records: List[dict]) -> None:
+        """Queue audit rows for the next batch insert, inside slots(). Never raises."""
+        self._buffer.extend(records)
+
+        # One background flush at a time; it drains everything queued meanwhile
+        if len(self._buffer) >= self.batch_size and not self._flushes:
+            task = asyncio.create_task(self._flush_in_background())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        """
+        Insert all buffered rows, one batch per statement
+
+        Raises:
+            Exception: If an insert fails; the failed batch stays buffered
+                for the next flush
+        """
+        async with self._lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                # Still counts towards max_size, since it returns to the buffer on failure
+                self._in_flight = len(batch)
+                try:
+                    await execute(get_supabase().table("audit_log").insert(batch))
+                except Exception:
+                    # Put the batch back in front, keeping the original order
+                    self._buffer.extendleft(reversed(batch))
+                    raise
+                finally:
+                    self._in_flight = 0
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Audit log flush failed: {e}")
+
+    async def close(self) -> None:
+        """Wait for running flushes and write everything still buffered. Called on shutdown."""
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+
+audit_writer = AuditWriter(settings.AUDIT_BUFFER_SIZE, settings.AUDIT_BATCH_SIZE)
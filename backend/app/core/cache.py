@@ -0,0 +1,264 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+
+# Read-through cache of serialized meeting detail responses, keyed by
+# (meeting, user). Every write path that changes what the detail endpoint
+# returns invalidates the meeting's entry; DETAIL_CACHE_TTL_SECONDS bounds how
+# long a change made outside the API (or missed by a worker with its own
+# memory cache) can be served.
+#
+# Reads return a version along with the entry, and a fill only stores the
+# body if no invalidation has happened since that read, so a response fetched
+# before a write cannot replace the write's invalidation.
+
+CacheEntry = Tuple[bytes, float]  # (body, cached_at epoch seconds)
+
+
+class DetailCacheBackend(ABC):
+    """Storage backend for cached meeting details"""
+
+    @abstractmethod
+    async def get(self, meeting_id: str, user_id: str) -> Tuple[Optional[CacheEntry], Optional[int]]:
+        """
+        Look up a meeting's entry
+
+        Returns:
+            The unexpired entry or None, and the version to pass to set()
+            (None if a fill must not be attempted)
+        """
+
+    @abstractmethod
+    async def set(self, meeting_id: str, user_id: str, body: bytes, version: int) -> bool:
+        """Store a serialized detail response unless it was invalidated since get() returned `version`"""
+
+    @abstractmethod
+    async def delete(self, meeting_id: str, user_id: str) -> None:
+        """Drop the entry for a meeting"""
+
+    @abstractmethod
+    async def delete_user(self, user_id: str) -> None:
+        """Drop all entries of a user"""
+
+    def __len__(self) -> int:
+        return 0
+
+
+class InMemoryDetailCache(DetailCacheBackend):
+    """
+    Process-local LRU. Invalidations are not seen by other workers.
+
+    The version is a counter of this worker's invalidations.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._writes = 0
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, meeting_id: str, user_id: str) -> Tuple[Optional[CacheEntry], Optional[int]]:
+        key = (meeting_id, user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, self._writes
+        if time.time() - entry[1] >= self.ttl_seconds:
+            del self._entries[key]
+            return None, self._writes
+        self._entries.move_to_end(key)
+        return entry, self._writes
+
+    async def set(self, meeting_id: str, user_id: str, body: bytes, version: int) -> bool:
+        if version != self._writes:
+            return False
+        key = (meeting_id, user_id)
+        self._entries[key] = (body, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    async def delete(self, meeting_id: str, user_id: str) -> None:
+        self._writes += 1
+        self._entries.pop((meeting_id, user_id), None)
+
+    async def delete_user(self, user_id: str) -> None:
+        self._writes += 1
+        for key in [key for key in self._entries if key[1] == user_id]:
+            del self._entries[key]
+
+
+class DatabaseDetailCache(DetailCacheBackend):
+    """
+    Cache backed by the meeting_detail_cache table, shared by all workers
+
+    The version is a per-meeting counter in the table, bumped by every
+    invalidation; the fill is conditional on it in SQL, so it holds across
+    workers (see the cache functions in database/schema.sql).
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, meeting_id: str, user_id: str) -> Tuple[Optional[CacheEntry], Optional[int]]:
+        supabase = get_supabase()
+        response = await execute(supabase.rpc("read_meeting_detail_cache", {
+            "p_meeting_id": meeting_id,
+            "p_user_id": user_id,
+            "p_ttl_seconds": self.ttl_seconds
+        }))
+
+        if not response.data:
+            return None, None  # Meeting not found: nothing to fill
+
+        record = response.data[0]
+        if record["body"] is None:
+            return None, record["version"]
+        return (record["body"].encode(), datetime.fromisoformat(record["cached_at"]).timestamp()), record["version"]
+
+    async def set(self, meeting_id: str, user_id: str, body: bytes, version: int) -> bool:
+        supabase = get_supabase()
+        response = await execute(supabase.rpc("fill_meeting_detail_cache", {
+            "p_meeting_id": meeting_id,
+            "p_user_id": user_id,
+            "p_body": body.decode(),
+            "p_version": version
+        }))
+        return bool(response.data)
+
+    async def delete(self, meeting_id: str, user_id: str) -> None:
+        supabase = get_supabase()
+        await execute(supabase.rpc("invalidate_meeting_detail_cache", {
+            "p_user_id": user_id,
+            "p_meeting_id": meeting_id
+        }))
+
+    async def delete_user(self, user_id: str) -> None:
+        supabase = get_supabase()
+        await execute(supabase.rpc("invalidate_meeting_detail_cache", {"p_user_id": user_id}))
+
+
+class MeetingDetailCache:
+    """
+    Read-through cache front with hit rate and staleness metrics
+
+    Backend failures are logged and treated as misses, so the cache never
+    fails a request. A response fetched after an invalidation of its meeting
+    began is not stored (the backend checks the version from get()), so a
+    fill cannot overwrite a newer invalidation.
+    """
+
+    def __init__(self, backend: Optional[DetailCacheBackend]):
+        self.backend = backend
+        self._stats: Dict[str, float] = {
+            "hits": 0, "misses": 0, "fills": 0, "skipped_fills": 0,
+            "invalidations": 0, "errors": 0, "hit_age_total": 0.0, "hit_age_max": 0.0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def get(self, meeting_id: str, user_id: str) -> Tuple[Optional[bytes], Optional[int]]:
+        """
+        Look up the cached detail body for a meeting
+
+        Returns:
+            The body or None on a miss, and the version to pass to put()
+            after fetching the response
+        """
+        try:
+            entry, version = await self.backend.get(meeting_id, user_id)
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"Meeting detail cache read failed: {e}")
+            entry, version = None, None
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None, version
+
+        body, cached_at = entry
+        age = max(time.time() - cached_at, 0.0)
+        self._stats["hits"] += 1
+        self._stats["hit_age_total"] += age
+        self._stats["hit_age_max"] = max(self._stats["hit_age_max"], age)
+        return body, version
+
+    async def put(self, meeting_id: str, user_id: str, body: bytes, version: Optional[int]) -> None:
+        """Store a detail body fetched after get() returned `version`"""
+        if version is None:
+            return
+        try:
+            if await self.backend.set(meeting_id, user_id, body, version):
+                self._stats["fills"] += 1
+            else:
+                self._stats["skipped_fills"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"Meeting detail cache write failed: {e}")
+
+    async def invalidate(self, meeting_id: str, user_id: str) -> None:
+        """Drop a meeting's cached detail. Call after every write that changes it."""
+        if not self.enabled:
+            return
+        self._stats["invalidations"] += 1
+        try:
+            await self.backend.delete(meeting_id, user_id)
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"Meeting detail cache invalidation failed for {meeting_id}: {e}")
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Drop all cached details of a user (e.g. after a project rename)"""
+        if not self.enabled:
+            return
+        self._stats["invalidations"] += 1
+        try:
+            await self.backend.delete_user(user_id)
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"Meeting detail cache invalidation failed for user {user_id}: {e}")
+
+    def stats(self) -> dict:
+        """Counters since startup for this worker"""
+        hits, misses = self._stats["hits"], self._stats["misses"]
+        lookups = hits + misses
+        return {
+            "backend": settings.DETAIL_CACHE_BACKEND,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "fills": self._stats["fills"],
+            "skipped_fills": self._stats["skipped_fills"],
+            "invalidations": self._stats["invalidations"],
+            "errors": self._stats["errors"],
+            "ttl_seconds": settings.DETAIL_CACHE_TTL_SECONDS,
+            "average_hit_age_seconds": round(self._stats["hit_age_total"] / hits, 3) if hits else None,
+            "max_hit_age_seconds": round(self._stats["hit_age_max"], 3)
+        }
+
+
+def _create_backend() -> Optional[DetailCacheBackend]:
+    if settings.DETAIL_CACHE_BACKEND == "database":
+        return DatabaseDetailCache(settings.DETAIL_CACHE_TTL_SECONDS)
+    if settings.DETAIL_CACHE_BACKEND == "memory":
+        return InMemoryDetailCache(settings.DETAIL_CACHE_MAX_ENTRIES, settings.DETAIL_CACHE_TTL_SECONDS)
+    if settings.DETAIL_CACHE_BACKEND == "none":
+        return None
+    raise ValueError(f"Unknown DETAIL_CACHE_BACKEND: {settings.DETAIL_CACHE_BACKEND}")
+
+
+detail_cache = MeetingDetailCache(_create_backend())
@@ -1,10 +1,36 @@
+from typing import Optional
+import anyio
 from supabase import create_client, Client
 from app.core.config import settings
 
 # Create Supabase client instance
 supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
+# Created on first use: a limiter must be bound to the running event loop
+_limiter: Optional[anyio.CapacityLimiter] = None
+
 
 def get_supabase() -> Client:
     """Get Supabase client instance"""
     return supabase
+
+
+async def execute(query):
+    """
+    Execute a Supabase query without blocking the event loop
+    
+    The Supabase client is synchronous, so the request runs in a worker
+    thread. At most DB_MAX_CONCURRENCY queries run at once per process;
+    further queries wait for a free thread.
+    
+    Args:
+        query: Query builder, e.g. supabase.table("meetings").select("*")
+        
+    Returns:
+        The query response
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(settings.DB_MAX_CONCURRENCY)
+    
+    return await anyio.to_thread.run_sync(query.execute, limiter=_limiter)
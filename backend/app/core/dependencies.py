@@ -2,7 +2,9 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.security import decode_access_token
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
+from app.core import postgres
+from app.core.postgres import postgres_enabled
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
@@ -42,17 +44,20 @@ async def get_current_user(
         )
     
     # Fetch user from database
-    supabase = get_supabase()
-    response = supabase.table("users").select("*").eq("id", user_id).execute()
+    if postgres_enabled():
+        user = await postgres.get_user(user_id)
+    else:
+        supabase = get_supabase()
+        response = await execute(supabase.table("users").select("*").eq("id", user_id))
+        user = response.data[0] if response.data else None
     
-    if not response.data or len(response.data) == 0:
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = response.data[0]
     # Remove sensitive data
     user.pop("hashed_password", None)
     
@@ -0,0 +1,89 @@
+import hashlib
+from typing import Awaitable, Callable, Iterable, List, Optional
+from fastapi import Request, Response
+from app.core.config import settings
+
+ETAG_HEADER = "ETag"
+
+# Clients may reuse a response only after revalidating it with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+# Columns identifying a row version: updated_at is bumped by a trigger on every update
+VERSION_COLUMNS = ["id", "updated_at"]
+
+
+def _etag(digest) -> str:
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def rows_etag(request: Request, rows: Iterable[dict]) -> str:
+    """
+    Strong ETag for rows read from the database, without serializing them
+
+    Derived from the request (path and query parameters, which select the
+    filters, page and fields), the API version and the id and updated_at of
+    each row, so any insert, delete or update in the row set changes it.
+    """
+    digest = hashlib.sha256(f"{settings.APP_VERSION} {request.url.path}".encode())
+    for key, value in sorted(request.query_params.multi_items()):
+        digest.update(f"\0{key}={value}".encode())
+    for row in rows:
+        digest.update(f"\0{row.get('id')}@{row.get('updated_at')}".encode())
+    return _etag(digest)
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag for an already serialized response body"""
+    return _etag(hashlib.sha256(body))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists the ETag (weak comparison, as RFC 9110 requires for it)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Add the validator headers to a 200 response"""
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching If-None-Match"""
+    return Response(status_code=304, headers={ETAG_HEADER: etag, "Cache-Control": CACHE_CONTROL})
+
+
+def conditional_json(request: Request, body: bytes) -> Response:
+    """JSON response for a serialized body with a content ETag, or 304 if If-None-Match lists it"""
+    etag = content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, etag)
+    return response
+
+
+async def check_not_modified(
+    request: Request,
+    fetch_versions: Callable[[], Awaitable[List[dict]]]
+) -> Optional[Response]:
+    """
+    Answer a conditional list request from row versions alone
+
+    Only runs when the request has If-None-Match. fetch_versions must run
+    the endpoint's query (same filters, order and limit) selecting
+    VERSION_COLUMNS, so the ETag equals the one of the full response.
+
+    Returns:
+        A 304 response if the client's copy is current, otherwise None
+    """
+    if "if-none-match" not in request.headers:
+        return None
+
+    etag = rows_etag(request, await fetch_versions())
+    return not_modified(etag) if etag_matches(request, etag) else None
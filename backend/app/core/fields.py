@@ -0,0 +1,86 @@
+from typing import Callable, Iterable, List, Optional, Type, Union
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+from app.core.serialization import FastJSONResponse, json_response
+
+
+class FieldSet:
+    """
+    Fields requested with ?fields=, validated against a response model
+
+    The same names are used for the database projection (columns()) and
+    for trimming the serialized response (trim() / response()). Rows are
+    returned as the database produced them, without model validation.
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = names
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def select_names(self, *extra: str, allowed: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Column names to select for the requested fields
+
+        Args:
+            extra: Columns needed by the query itself (e.g. pagination keys)
+            allowed: Restrict to these names (fields that are real columns)
+        """
+        names = [name for name in self.names if allowed is None or name in allowed]
+        for name in extra:
+            if name not in names:
+                names.append(name)
+        return names
+
+    def columns(self, *extra: str, allowed: Optional[Iterable[str]] = None) -> str:
+        """PostgREST select list for the requested fields (see select_names)"""
+        return ", ".join(self.select_names(*extra, allowed=allowed))
+
+    def trim(self, row: dict) -> dict:
+        """Keep only the requested fields of a row"""
+        return {name: row.get(name) for name in self.names}
+
+    def response(self, content: Union[dict, List[dict]], response: Optional[Response] = None) -> FastJSONResponse:
+        """JSON response with the trimmed row(s), carrying the endpoint's headers (see json_response)"""
+        if isinstance(content, list):
+            body = [self.trim(row) for row in content]
+        else:
+            body = self.trim(content)
+
+        return json_response(body, response)
+
+
+def sparse_fields(model: Type[BaseModel]) -> Callable[..., Optional[FieldSet]]:
+    """
+    Dependency factory for a ?fields= parameter validated against a model
+
+    The dependency returns None when the parameter is absent, so endpoints
+    fall back to returning whole rows.
+    """
+    allowed = list(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated fields to return (any of: {', '.join(allowed)})"
+        )
+    ) -> Optional[FieldSet]:
+        if fields is None:
+            return None
+
+        names = []
+        for name in (part.strip() for part in fields.split(",")):
+            if name and name not in names:
+                names.append(name)
+
+        unknown = [name for name in names if name not in allowed]
+        if not names or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+            )
+
+        return FieldSet(names)
+
+    return dependency
@@ -0,0 +1,321 @@
+import asyncio
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from postgrest.exceptions import APIError
+from starlette.datastructures import UploadFile
+
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+from app.core.dependencies import get_current_user_id
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+STATE_IN_PROGRESS = "in_progress"
+STATE_COMPLETED = "completed"
+
+UNIQUE_VIOLATION = "23505"
+
+FINGERPRINT_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class IdempotencyStore(ABC):
+    """Storage backend for idempotency records"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        """Return the unexpired record for a key, or None"""
+
+    @abstractmethod
+    async def reserve(self, key: str, user_id: str, request_hash: str) -> bool:
+        """Atomically claim a key for a request. Returns False if it is already claimed."""
+
+    @abstractmethod
+    async def complete(self, key: str, status_code: int, body) -> None:
+        """Store the final response for a claimed key"""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        """Drop a claim so the request can be retried"""
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Process-local store. Keys are not shared between workers."""
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self._records: Dict[str, dict] = {}
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        expired = [k for k, r in self._records.items() if r["expires_at"] <= now]
+        for key in expired:
+            del self._records[key]
+
+    async def get(self, key: str) -> Optional[dict]:
+        self._purge_expired()
+        return self._records.get(key)
+
+    async def reserve(self, key: str, user_id: str, request_hash: str) -> bool:
+        self._purge_expired()
+        if key in self._records:
+            return False
+        self._records[key] = {
+            "state": STATE_IN_PROGRESS,
+            "user_id": user_id,
+            "request_hash": request_hash,
+            "expires_at": time.monotonic() + self.lock_seconds,
+        }
+        return True
+
+    async def complete(self, key: str, status_code: int, body) -> None:
+        self._records[key] = {
+            **self._records.get(key, {}),
+            "state": STATE_COMPLETED,
+            "status_code": status_code,
+            "response": body,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        }
+
+    async def release(self, key: str) -> None:
+        self._records.pop(key, None)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Store backed by the idempotency_keys table, shared by all workers"""
+
+    table = "idempotency_keys"
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    def _expires_at(self, seconds: int) -> str:
+        return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+    async def get(self, key: str) -> Optional[dict]:
+        supabase = get_supabase()
+        response = await execute(supabase.table(self.table).select("*").eq("key", key))
+
+        if not response.data:
+            return None
+
+        record = response.data[0]
+        if datetime.fromisoformat(record["expires_at"]) <= datetime.now(timezone.utc):
+            await self.release(key)
+            return None
+
+        return record
+
+    async def reserve(self, key: str, user_id: str, request_hash: str) -> bool:
+        supabase = get_supabase()
+        try:
+            await execute(supabase.table(self.table).insert({
+                "key": key,
+                "user_id": user_id,
+                "request_hash": request_hash,
+                "state": STATE_IN_PROGRESS,
+                "expires_at": self._expires_at(self.lock_seconds)
+            }))
+        except APIError as e:
+            # Primary key conflict: another worker owns this key. Anything
+            # else propagates, since running the handler unclaimed would
+            # turn idempotency off silently.
+            if e.code == UNIQUE_VIOLATION:
+                return False
+            raise
+        return True
+
+    async def complete(self, key: str, status_code: int, body) -> None:
+        supabase = get_supabase()
+        await execute(supabase.table(self.table).update({
+            "state": STATE_COMPLETED,
+            "status_code": status_code,
+            "response": body,
+            "expires_at": self._expires_at(self.ttl_seconds)
+        }).eq("key", key))
+
+    async def release(self, key: str) -> None:
+        supabase = get_supabase()
+        await execute(supabase.table(self.table).delete().eq("key", key))
+
+
+def _create_store() -> IdempotencyStore:
+    if settings.IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+    if settings.IDEMPOTENCY_BACKEND == "memory":
+        return InMemoryIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {settings.IDEMPOTENCY_BACKEND}")
+
+
+idempotency_store: IdempotencyStore = _create_store()
+
+# Requests currently executing in this process, keyed by store key.
+# Concurrent retries await the same future instead of re-running the handler.
+_in_flight: Dict[str, Tuple[asyncio.Future, Optional[str]]] = {}
+
+
+def _replay(record: dict) -> JSONResponse:
+    return JSONResponse(
+        status_code=record["status_code"],
+        content=record["response"],
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+async def request_fingerprint(request: Request) -> str:
+    """
+    SHA-256 of a request's method, path and body
+
+    Multipart bodies are hashed from the parsed form (the framework has
+    already consumed the stream), reading uploaded files in chunks and
+    rewinding them for the handler.
+    """
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\0".encode())
+
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        for name, value in form.multi_items():
+            digest.update(f"\0{name}=".encode())
+            if isinstance(value, UploadFile):
+                digest.update(f"{value.filename}\0".encode())
+                while chunk := await value.read(FINGERPRINT_CHUNK_SIZE):
+                    digest.update(chunk)
+                await value.seek(0)
+            else:
+                digest.update(value.encode())
+    else:
+        digest.update(await request.body())
+
+    return digest.hexdigest()
+
+
+class IdempotentRequest:
+    """Runs a handler at most once per (user, endpoint, Idempotency-Key)"""
+
+    def __init__(
+        self,
+        key: Optional[str],
+        user_id: str,
+        scope: str,
+        request_hash: Optional[str] = None,
+        status_code: int = 200
+    ):
+        self.key = key
+        self.user_id = user_id
+        self.scope = scope
+        self.request_hash = request_hash
+        self.status_code = status_code
+
+    @property
+    def store_key(self) -> str:
+        raw = f"{self.user_id}:{self.scope}:{self.key}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def run(self, handler: Callable[[], Awaitable]):
+        """
+        Execute handler, or replay the stored response for a repeated key
+
+        Args:
+            handler: Zero-argument coroutine function producing a JSON-serializable body
+
+        Returns:
+            The handler result, or a replayed JSONResponse
+
+        Raises:
+            HTTPException: 409 if the same key is being processed by another
+                worker, 422 if the key was used for a different request
+        """
+        if self.key is None:
+            return await handler()
+
+        store_key = self.store_key
+
+        in_flight = _in_flight.get(store_key)
+        if in_flight is not None:
+            future, request_hash = in_flight
+            self._check_same_request(request_hash)
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        _in_flight[store_key] = (future, self.request_hash)
+        try:
+            result = await self._execute(store_key, handler)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del _in_flight[store_key]
+
+    def _check_same_request(self, request_hash: Optional[str]) -> None:
+        if request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"This {IDEMPOTENCY_HEADER} was already used for a different request"
+            )
+
+    async def _execute(self, store_key: str, handler: Callable[[], Awaitable]):
+        record = await idempotency_store.get(store_key)
+
+        if record is None and not await idempotency_store.reserve(store_key, self.user_id, self.request_hash):
+            record = await idempotency_store.get(store_key)
+
+        if record is not None:
+            self._check_same_request(record.get("request_hash"))
+            if record["state"] == STATE_COMPLETED:
+                return _replay(record)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is already in progress"
+            )
+
+        try:
+            body = await handler()
+        except BaseException:
+            # Failed requests are not remembered, so the client can retry them
+            await idempotency_store.release(store_key)
+            raise
+
+        try:
+            await idempotency_store.complete(store_key, self.status_code, body)
+        except Exception as e:
+            # The handler's effects are done, so the response still goes
+            # out; drop the claim rather than leave retries stuck on 409
+            print(f"Idempotency record for {self.scope} could not be stored: {e}")
+            try:
+                await idempotency_store.release(store_key)
+            except Exception as release_error:
+                print(f"Idempotency claim for {self.scope} could not be released: {release_error}")
+        return body
+
+
+async def get_idempotent_request(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+    user_id: str = Depends(get_current_user_id)
+) -> IdempotentRequest:
+    """Dependency providing idempotent execution for the current request"""
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be between 1 and {MAX_KEY_LENGTH} characters"
+        )
+
+    scope = f"{request.method} {request.url.path}"
+    if idempotency_key is None:
+        return IdempotentRequest(None, user_id, scope)
+    return IdempotentRequest(idempotency_key, user_id, scope, await request_fingerprint(request))
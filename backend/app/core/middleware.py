@@ -0,0 +1,68 @@
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized uploads before their body is read
+
+    Multipart bodies are spooled to disk by the framework before the endpoint
+    runs, so the endpoint's own size check comes too late to save the transfer.
+    This checks the declared Content-Length up front and cuts off bodies that
+    stream past the limit without declaring one.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_suffixes: tuple):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_suffixes = path_suffixes
+
+    @property
+    def detail(self) -> str:
+        return f"Request body too large. Maximum size: {self.max_body_size // (1024*1024)}MB"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT", "PATCH")
+            or not scope["path"].endswith(self.path_suffixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                content_length = int(content_length)
+            except ValueError:
+                response = JSONResponse(
+                    status_code=400,
+                    content={"detail": "Invalid Content-Length header"},
+                    headers={"Connection": "close"}
+                )
+                await response(scope, receive, send)
+                return
+
+        if content_length is not None and content_length > self.max_body_size:
+            response = JSONResponse(
+                status_code=413,
+                content={"detail": self.detail},
+                headers={"Connection": "close"}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Handled by the application's HTTPException handler
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,113 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Query, Response, status
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    """Requested page: the cursor returned with the previous page, and a page size"""
+    cursor: Optional[str]
+    limit: int
+
+    def position(self) -> Tuple[Any, Optional[str]]:
+        """(sort value, id) of the last row of the previous page, or (None, None) on the first page"""
+        return decode_cursor(self.cursor) if self.cursor else (None, None)
+
+
+def get_page_params(
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Page size")
+) -> PageParams:
+    """Dependency reading the pagination query parameters"""
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def encode_cursor(sort_value: Any, row_id: str) -> str:
+    """Encode the position after a row as an opaque cursor"""
+    raw = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if not isinstance(row_id, str) or not isinstance(sort_value, (str, type(None))):
+            raise ValueError
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return sort_value, row_id
+
+
+def _quote(value: str) -> str:
+    # Values inside PostgREST logical filters may contain reserved characters
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+@dataclass
+class Keyset:
+    """
+    Keyset pagination over a sort column, with the row ID as tie-breaker
+
+    Each page continues strictly after the (sort value, id) of the last row
+    of the previous page, so deep pages cost the same as the first one.
+    NULL sort values are ordered as Postgres does by default: last when
+    ascending, first when descending.
+    """
+    column: str
+    desc: bool = False
+    nullable: bool = False
+
+    def apply(self, query, page: PageParams):
+        """Add the cursor filter, ordering and limit to a PostgREST query"""
+        sort_value, row_id = page.position()
+        if row_id is not None:
+            query = query.or_(self._after(sort_value, row_id))
+
+        # One extra row tells whether there is a next page
+        return query.order(self.column, desc=self.desc).order("id", desc=self.desc).limit(page.limit + 1)
+
+    def _after(self, sort_value: Optional[str], row_id: str) -> str:
+        op = "lt" if self.desc else "gt"
+        col = self.column
+        after_id = f"id.{op}.{_quote(row_id)}"
+
+        if sort_value is None:
+            # Continuing inside the NULL group
+            tie = f"and({col}.is.null,{after_id})"
+            return f"{col}.not.is.null,{tie}" if self.desc else tie
+
+        value = _quote(sort_value)
+        conditions = [f"{col}.{op}.{value}", f"and({col}.eq.{value},{after_id})"]
+        if self.nullable and not self.desc:
+            conditions.append(f"{col}.is.null")
+        return ",".join(conditions)
+
+    def page(self, rows: List[dict], page: PageParams, response: Response) -> List[dict]:
+        """
+        Trim rows fetched with apply() to the page size
+
+        Sets the X-Next-Cursor header if there are more rows.
+        """
+        if len(rows) <= page.limit:
+            return rows
+
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[self.column], last["id"])
+        return rows
@@ -0,0 +1,219 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from app.core.config import settings
+
+try:
+    import asyncpg
+except ImportError:  # Optional dependency, only needed for DATABASE_BACKEND=asyncpg
+    asyncpg = None
+
+# Direct Postgres access for the hottest read paths (DATABASE_BACKEND=asyncpg).
+# asyncpg prepares each statement once per connection and reuses it from its
+# statement cache, so queries use fixed SQL with nullable parameters instead of
+# being built per request. Rows come back as the same JSON-style dicts
+# PostgREST returns, so routers can use either path.
+_pool = None
+
+
+def postgres_enabled() -> bool:
+    """Whether hot paths should query Postgres directly"""
+    return settings.DATABASE_BACKEND == "asyncpg"
+
+
+async def _init_connection(connection) -> None:
+    # PostgREST returns JSON columns parsed; asyncpg returns them as text by default
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+
+
+async def init_postgres() -> None:
+    """Open the connection pool. Called on startup when the backend is enabled."""
+    global _pool
+    if asyncpg is None:
+        raise RuntimeError("DATABASE_BACKEND=asyncpg requires the asyncpg package")
+    if not settings.DATABASE_URL:
+        raise RuntimeError("DATABASE_BACKEND=asyncpg requires DATABASE_URL")
+
+    _pool = await asyncpg.create_pool(
+        settings.DATABASE_URL,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        init=_init_connection
+    )
+
+
+async def close_postgres() -> None:
+    """Close the connection pool"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def _get_pool():
+    if _pool is None:
+        raise RuntimeError("Postgres pool is not initialized")
+    return _pool
+
+
+def _json_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+    return value
+
+
+def _to_dict(record) -> dict:
+    """Convert a record to the dict PostgREST would return for the row"""
+    return {key: _json_value(value) for key, value in record.items()}
+
+
+async def fetch(sql: str, *args) -> List[dict]:
+    """Run a query on a pooled connection and return its rows as dicts"""
+    async with _get_pool().acquire() as connection:
+        records = await connection.fetch(sql, *args)
+    return [_to_dict(record) for record in records]
+
+
+async def fetch_one(sql: str, *args) -> Optional[dict]:
+    """Run a query and return its first row as a dict, or None"""
+    async with _get_pool().acquire() as connection:
+        record = await connection.fetchrow(sql, *args)
+    return _to_dict(record) if record is not None else None
+
+
+# Hot queries. List queries take a {columns} select list, so sparse fieldsets
+# are projected in the database (each distinct list is its own statement).
+
+USER_BY_ID = "SELECT * FROM users WHERE id = $1"
+
+MEETINGS_FOR_USER = """
+    SELECT {columns} FROM meetings
+    WHERE user_id = $1
+      AND ($2::uuid IS NULL OR project_id = $2)
+      AND ($3::text IS NULL OR meeting_type = $3)
+      AND ($4::date IS NULL OR meeting_date >= $4)
+      AND ($5::date IS NULL OR meeting_date <= $5)
+      AND ($7::uuid IS NULL OR (meeting_date, id) < ($6::text::date, $7::uuid))
+    ORDER BY meeting_date DESC, id DESC
+    LIMIT $8
+"""
+
+# Meeting, project and all extracted data in one statement. Child rows are
+# aggregated as JSON, as PostgREST renders them, without the full-text search
+# vectors.
+MEETING_DETAIL = """
+    SELECT m.*, p.name AS project_name, p.color AS project_color,
+        COALESCE((SELECT jsonb_agg(to_jsonb(t) - 'search_vector') FROM transcripts t WHERE t.meeting_id = m.id), '[]') AS transcripts,
+        COALESCE((SELECT jsonb_agg(to_jsonb(d) - 'search_vector') FROM decisions d WHERE d.meeting_id = m.id), '[]') AS decisions,
+        COALESCE((SELECT jsonb_agg(to_jsonb(a) - 'search_vector') FROM action_items a WHERE a.meeting_id = m.id), '[]') AS action_items,
+        COALESCE((SELECT json_agg(f) FROM follow_ups f WHERE f.meeting_id = m.id), '[]') AS follow_ups,
+        COALESCE((SELECT jsonb_agg(to_jsonb(ps) - 'search_vector') FROM problem_statements ps WHERE ps.meeting_id = m.id), '[]') AS problem_statements
+    FROM meetings m
+    LEFT JOIN projects p ON p.id = m.project_id
+    WHERE m.id = $1 AND m.user_id = $2
+"""
+
+PENDING_ACTIONS_FOR_USER = """
+    SELECT {columns} FROM action_items a
+    JOIN meetings m ON m.id = a.meeting_id
+    WHERE m.user_id = $1 AND a.status IN ('PENDING', 'APPROVED')
+      AND ($3::uuid IS NULL
+           OR ($2::text IS NOT NULL AND ((a.due_date, a.id) > ($2::text::date, $3::uuid) OR a.due_date IS NULL))
+           OR ($2::text IS NULL AND a.due_date IS NULL AND a.id > $3::uuid))
+    ORDER BY a.due_date, a.id
+    LIMIT $4
+"""
+
+ACTIONS_FOR_USER = """
+    SELECT {columns} FROM action_items a
+    JOIN meetings m ON m.id = a.meeting_id
+    WHERE m.user_id = $1
+      AND ($2::text IS NULL OR a.status = $2)
+      AND ($3::uuid IS NULL OR a.meeting_id = $3)
+      AND ($5::uuid IS NULL OR (a.created_at, a.id) < ($4::text::timestamptz, $5::uuid))
+    ORDER BY a.created_at DESC, a.id DESC
+    LIMIT $6
+"""
+
+
+def _select_list(columns: Optional[List[str]], alias: Optional[str] = None) -> str:
+    # Column names come from validated response model fields, never from raw input
+    prefix = f"{alias}." if alias else ""
+    if not columns:
+        return f"{prefix}*"
+    return ", ".join(f'{prefix}"{column}"' for column in columns)
+
+
+async def get_user(user_id: str) -> Optional[dict]:
+    """Fetch a user row by ID, or None if there is none (including IDs that are not UUIDs)"""
+    try:
+        uuid.UUID(user_id)
+    except (TypeError, ValueError):
+        return None
+    return await fetch_one(USER_BY_ID, user_id)
+
+
+async def list_meetings(
+    user_id: str,
+    project_id: Optional[str] = None,
+    meeting_type: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    after: Tuple[Optional[str], Optional[str]] = (None, None),
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None
+) -> List[dict]:
+    """
+    Meetings of a user, newest first, with optional filters
+
+    `after` is the (meeting_date, id) keyset position to continue from.
+    """
+    sql = MEETINGS_FOR_USER.format(columns=_select_list(columns))
+    return await fetch(sql, user_id, project_id, meeting_type, start_date, end_date, *after, limit)
+
+
+async def get_meeting_detail(meeting_id: str, user_id: str) -> Optional[dict]:
+    """
+    Fetch a meeting with its project name / color and all extracted data
+
+    Returns:
+        Meeting row with project_name, project_color and one list per child
+        table (keyed by table name), or None if the user has no such meeting
+    """
+    return await fetch_one(MEETING_DETAIL, meeting_id, user_id)
+
+
+async def list_pending_actions(
+    user_id: str,
+    after: Tuple[Optional[str], Optional[str]] = (None, None),
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None
+) -> List[dict]:
+    """Pending and approved action items of a user, by due date, continuing after (due_date, id)"""
+    sql = PENDING_ACTIONS_FOR_USER.format(columns=_select_list(columns, "a"))
+    return await fetch(sql, user_id, *after, limit)
+
+
+async def list_actions(
+    user_id: str,
+    status: Optional[str] = None,
+    meeting_id: Optional[str] = None,
+    after: Tuple[Optional[str], Optional[str]] = (None, None),
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None
+) -> List[dict]:
+    """Action items of a user, newest first, with optional filters, continuing after (created_at, id)"""
+    sql = ACTIONS_FOR_USER.format(columns=_select_list(columns, "a"))
+    return await fetch(sql, user_id, status, meeting_id, *after, limit)
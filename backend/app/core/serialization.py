@@ -0,0 +1,117 @@
+import inspect
+import json
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple, Type, Union, get_args, get_origin
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; the standard json module is used without it
+    orjson = None
+
+
+def _default(value: Any):
+    # Types asyncpg rows or model defaults can still contain
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-style content, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed (the app's default response class)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    JSON response for already JSON-style content
+
+    Headers already set on the endpoint's Response (e.g. X-Next-Cursor,
+    ETag) are carried over, since FastAPI does not merge them into a
+    returned response.
+    """
+    headers = {}
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return FastJSONResponse(content=content, headers=headers)
+
+
+def _nested_model(annotation) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The response model a field holds (unwrapping Optional), and whether it is a list of them"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            annotation = args[0]
+
+    is_list = get_origin(annotation) in (list, List)
+    if is_list:
+        annotation = get_args(annotation)[0] if get_args(annotation) else None
+
+    if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+        return annotation, is_list
+    return None, False
+
+
+class RowSerializer:
+    """
+    Renders trusted database rows as a response model would, without validating them
+
+    Rows are projected onto the model's fields, with the field defaults for
+    missing columns and nested response models projected the same way, and
+    encoded in one pass. Values are returned as the database produced them
+    (e.g. timestamps keep their Postgres formatting), as sparse fieldsets
+    already do; Model(**row) plus FastAPI's response_model would validate
+    and serialize every row twice. Only use it for rows read from the
+    database, never for request input.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._fields = []
+        for name, field in model.model_fields.items():
+            default = field.get_default(call_default_factory=True)
+            nested, is_list = _nested_model(field.annotation)
+            self._fields.append((
+                name,
+                None if default is PydanticUndefined else default,
+                RowSerializer(nested) if nested else None,
+                is_list
+            ))
+
+    def row(self, row: dict) -> dict:
+        """Project one row onto the model's fields"""
+        projected = {}
+        for name, default, nested, is_list in self._fields:
+            value = row.get(name, default)
+            if nested is not None and value is not None:
+                value = [nested.row(item) for item in value] if is_list else nested.row(value)
+            projected[name] = value
+        return projected
+
+    def project(self, content: Union[dict, List[dict]]) -> Union[dict, List[dict]]:
+        """Project a row or a list of rows"""
+        if isinstance(content, list):
+            return [self.row(row) for row in content]
+        return self.row(content)
+
+    def dumps(self, content: Union[dict, List[dict]]) -> bytes:
+        """Serialized JSON body for a row or a list of rows"""
+        return dumps(self.project(content))
+
+    def response(self, content: Union[dict, List[dict]], response: Optional[Response] = None) -> FastJSONResponse:
+        """JSON response for a row or a list of rows (see json_response)"""
+        return json_response(self.project(content), response)
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Awaitable, Callable, List
+
+_tasks: List[asyncio.Task] = []
+
+
+def schedule_periodic(name: str, interval_seconds: float, job: Callable[[], Awaitable]) -> None:
+    """
+    Run a background job every interval_seconds for the life of the process
+
+    Failures are logged and the job runs again at the next interval.
+    """
+    async def run():
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await job()
+            except Exception as e:
+                print(f"Background task {name} failed: {e}")
+
+    _tasks.append(asyncio.create_task(run(), name=name))
+
+
+async def cancel_periodic() -> None:
+    """Stop all scheduled background jobs"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
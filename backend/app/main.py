@@ -1,7 +1,19 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.routers import auth, projects, meetings, actions, emails
+from app.core.middleware import UploadSizeLimitMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.etag import ETAG_HEADER
+from app.core.serialization import FastJSONResponse
+from app.core.tasks import schedule_periodic, cancel_periodic
+from app.core.cache import detail_cache
+from app.core.audit import audit_buffered, audit_writer, maintain_audit_log
+from app.core.postgres import postgres_enabled, init_postgres, close_postgres
+from app.services.storage import MAX_FILE_SIZE, purge_expired_originals
+from app.services.transcoding import shutdown_transcoder
+from app.services.audio_gc import run_scheduled_collection
+from app.services.uploads import purge_expired_upload_sessions
+from app.routers import auth, projects, meetings, uploads, actions, emails, dashboard, search
 
 # Create FastAPI app
 app = FastAPI(
@@ -9,7 +21,16 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="Meeting Intelligence API - Transform meetings into actionable insights",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
+)
+
+# Reject oversized audio uploads before the body is spooled
+# (1MB headroom for multipart boundaries and form fields)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=MAX_FILE_SIZE + 1024 * 1024,
+    path_suffixes=("/audio",)
 )
 
 # Configure CORS
@@ -19,14 +40,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(meetings.router)
+app.include_router(uploads.router)
 app.include_router(actions.router)
 app.include_router(emails.router)
+app.include_router(dashboard.router)
+app.include_router(search.router)
 
 
 @app.get("/")
@@ -49,18 +74,44 @@ async def health_check():
     }
 
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Meeting detail cache hit rate and staleness for this worker"""
+    return detail_cache.stats()
+
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event handler"""
     print(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     print(f"Debug mode: {settings.DEBUG}")
     print(f"CORS origins: {settings.cors_origins_list}")
+    
+    if postgres_enabled():
+        await init_postgres()
+    
+    if settings.AUDIO_ORIGINAL_RETENTION_DAYS > 0:
+        schedule_periodic("purge-expired-originals", 3600, purge_expired_originals)
+    schedule_periodic("purge-upload-sessions", 3600, purge_expired_upload_sessions)
+    if settings.AUDIO_GC_INTERVAL_HOURS > 0:
+        schedule_periodic("audio-gc", settings.AUDIO_GC_INTERVAL_HOURS * 3600, run_scheduled_collection)
+    if audit_buffered():
+        schedule_periodic("flush-audit-log", settings.AUDIT_FLUSH_INTERVAL_SECONDS, audit_writer.flush)
+    if settings.AUDIT_MAINTENANCE_INTERVAL_HOURS > 0:
+        schedule_periodic("maintain-audit-log", settings.AUDIT_MAINTENANCE_INTERVAL_HOURS * 3600, maintain_audit_log)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     print(f"Shutting down {settings.APP_NAME}")
+    await cancel_periodic()
+    try:
+        await audit_writer.close()
+    except Exception as e:
+        print(f"Could not flush {len(audit_writer)} audit records: {e}")
+    await close_postgres()
+    shutdown_transcoder()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import date
+
+
+class ProjectMeetingCount(BaseModel):
+    """Number of meetings in a project"""
+    project_id: str
+    meeting_count: int
+
+
+class DashboardStats(BaseModel):
+    """Home page counters of the current user"""
+    pending_actions: int = 0
+    approved_actions: int = 0
+    open_follow_ups: int = 0
+    total_meetings: int = 0
+    meetings_this_week: int = 0
+    week_start: date
+    meetings_per_project: List[ProjectMeetingCount] = Field(default_factory=list)
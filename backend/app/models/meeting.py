@@ -35,6 +35,20 @@ class ActionStatus(str, Enum):
     COMPLETED = "COMPLETED"
 
 
+class ActionTransition(str, Enum):
+    """Review transitions accepted by the bulk endpoint"""
+    APPROVE = "approve"
+    REJECT = "reject"
+    COMPLETE = "complete"
+
+
+class BulkOutcome(str, Enum):
+    """Result of one entry of a bulk review"""
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    INVALID_STATE = "invalid_state"
+
+
 class FollowUpStatus(str, Enum):
     """Follow-up status enumeration"""
     TRACKED = "Tracked"
@@ -78,6 +92,10 @@ class MeetingResponse(MeetingBase):
     status: MeetingStatus
     audio_file_path: Optional[str] = None
     audio_file_url: Optional[str] = None
+    audio_file_size: Optional[int] = None
+    audio_file_sha256: Optional[str] = None
+    audio_original_size: Optional[int] = None
+    audio_compression_ratio: Optional[float] = None
     summary: Optional[str] = None
     created_at: datetime
     updated_at: datetime
@@ -154,6 +172,32 @@ class ActionItemResponse(ActionItemBase):
         from_attributes = True
 
 
+class BulkActionEntry(BaseModel):
+    """One action item of a bulk review"""
+    id: str
+    transition: ActionTransition
+
+
+class BulkActionRequest(BaseModel):
+    """Bulk review request"""
+    items: List[BulkActionEntry] = Field(..., min_length=1, max_length=500)
+
+
+class BulkActionResult(BaseModel):
+    """Outcome of one entry of a bulk review"""
+    id: str
+    transition: ActionTransition
+    outcome: BulkOutcome
+    previous_status: Optional[ActionStatus] = None
+    action_item: Optional[ActionItemResponse] = None
+
+
+class BulkActionResponse(BaseModel):
+    """Bulk review response, with results in request order"""
+    updated: int
+    results: List[BulkActionResult]
+
+
 # Follow-up Models
 class FollowUpResponse(BaseModel):
     """Follow-up response model"""
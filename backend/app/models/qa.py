@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class AskRequest(BaseModel):
+    """Question about a meeting or a project"""
+    question: str = Field(..., min_length=1, max_length=1000)
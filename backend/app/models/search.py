@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from datetime import date
+from enum import Enum
+
+
+class SearchSource(str, Enum):
+    """Kind of record a search result was found in"""
+    TRANSCRIPT = "transcript"
+    DECISION = "decision"
+    ACTION_ITEM = "action_item"
+    FOLLOW_UP = "follow_up"  # Semantic search only
+    PROBLEM_STATEMENT = "problem_statement"
+
+
+class SearchResult(BaseModel):
+    """A ranked full-text search match"""
+    source: SearchSource
+    id: str
+    meeting_id: str
+    meeting_title: str
+    meeting_date: date
+    rank: float
+    snippet: str  # Matching fragments, with matched terms wrapped in <mark></mark>
+
+
+class SemanticSearchResult(BaseModel):
+    """A meeting chunk similar in meaning to the query"""
+    source: SearchSource
+    id: str  # ID of the transcript or extracted item
+    meeting_id: str
+    score: float  # Cosine similarity
+    text: str
@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class ResumableUploadCreate(BaseModel):
+    """Resumable upload session creation model"""
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0, description="Total size of the file in bytes")
+
+
+class ResumableUploadResponse(BaseModel):
+    """Resumable upload session response model"""
+    id: str
+    meeting_id: str
+    filename: str
+    size: int
+    offset: int
+    status: str
+    file_path: Optional[str] = None
+    expires_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SignedUploadCreate(BaseModel):
+    """Direct-to-storage upload request model"""
+    filename: str = Field(..., min_length=1, max_length=255)
+
+
+class SignedUploadResponse(BaseModel):
+    """Signed upload URL for uploading audio straight to storage"""
+    signed_url: str
+    token: str
+    file_path: str
+
+
+class SignedUploadComplete(BaseModel):
+    """Direct-to-storage upload completion model"""
+    file_path: str = Field(..., min_length=1, max_length=500)
@@ -1,59 +1,135 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from collections import Counter
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List, Optional
 from app.models.meeting import (
     ActionItemResponse, ActionItemUpdate, ActionStatus,
+    BulkActionRequest, BulkActionResponse, BulkOutcome,
     FollowUpResponse, FollowUpStatus
 )
-from app.core.database import get_supabase
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+from app.core.cache import detail_cache
+from app.core import postgres
+from app.core.postgres import postgres_enabled
 from app.core.dependencies import get_current_user_id
+from app.core.pagination import Keyset, PageParams, get_page_params
+from app.core.fields import FieldSet, sparse_fields
+from app.core.etag import VERSION_COLUMNS, check_not_modified, rows_etag, set_etag
+from app.core.serialization import RowSerializer
+from app.services.semantic_index import ITEM_SOURCES, index_meeting
+from app.services.transitions import (
+    review_action_items, transition_action_items, transition_follow_ups, raise_transition_error
+)
 
 router = APIRouter(prefix="/api/actions", tags=["Actions"])
 
+PENDING_KEYSET = Keyset("due_date", nullable=True)
+NEWEST_FIRST_KEYSET = Keyset("created_at", desc=True)
 
-@router.get("/pending", response_model=List[ActionItemResponse])
-async def get_pending_actions(user_id: str = Depends(get_current_user_id)):
-    """Get all pending action items for the current user"""
-    supabase = get_supabase()
-    
-    # Get all meetings for user
-    meetings_response = supabase.table("meetings").select("id").eq("user_id", user_id).execute()
-    meeting_ids = [m["id"] for m in meetings_response.data]
-    
-    if not meeting_ids:
-        return []
-    
-    # Get pending actions for these meetings
-    response = supabase.table("action_items").select("*").in_("meeting_id", meeting_ids).in_("status", ["PENDING", "APPROVED"]).order("due_date").execute()
+ACTION_ROWS = RowSerializer(ActionItemResponse)
+FOLLOW_UP_ROWS = RowSerializer(FollowUpResponse)
+
+
+def _user_rows(table: str, user_id: str, columns: str = "*"):
+    """
+    Select rows of a meeting child table that belong to the user's meetings
     
-    return [ActionItemResponse(**action) for action in response.data]
+    Ownership is filtered in the database through an inner join on the
+    meeting, so the query is one round trip whatever the meeting count.
+    """
+    supabase = get_supabase()
+    return supabase.table(table).select(f"{columns}, meetings!inner(user_id)").eq("meetings.user_id", user_id)
 
 
-@router.get("", response_model=List[ActionItemResponse])
-async def get_all_actions(
-    status: Optional[ActionStatus] = None,
-    meeting_id: Optional[str] = None,
+def _without_meeting(rows: List[dict]) -> List[dict]:
+    """Drop the embedded meeting used for the ownership join"""
+    for row in rows:
+        row.pop("meetings", None)
+    return rows
+
+
+async def _query_pending_actions(user_id: str, page: PageParams, columns: Optional[List[str]]) -> List[dict]:
+    """Pending and approved action items of the user's meetings by due date, with one row past the page"""
+    if postgres_enabled():
+        return await postgres.list_pending_actions(user_id, after=page.position(), limit=page.limit + 1, columns=columns)
+    
+    query = _user_rows("action_items", user_id, ", ".join(columns) if columns else "*")
+    query = query.in_("status", ["PENDING", "APPROVED"])
+    result = await execute(PENDING_KEYSET.apply(query, page))
+    return _without_meeting(result.data)
+
+
+@router.get("/pending", response_model=List[ActionItemResponse])
+async def get_pending_actions(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(ActionItemResponse)),
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get all action items with optional filters"""
-    supabase = get_supabase()
-    
-    # Get all meetings for user
-    meetings_response = supabase.table("meetings").select("id").eq("user_id", user_id).execute()
-    meeting_ids = [m["id"] for m in meetings_response.data]
-    
-    if not meeting_ids:
-        return []
+    """Get pending action items for the current user by due date, one page at a time. Supports If-None-Match."""
+    unchanged = await check_not_modified(request, lambda: _query_pending_actions(user_id, page, VERSION_COLUMNS))
+    if unchanged:
+        return unchanged
+    
+    columns = fields.select_names("id", PENDING_KEYSET.column, *VERSION_COLUMNS) if fields else None
+    actions = await _query_pending_actions(user_id, page, columns)
+    set_etag(response, rows_etag(request, actions))
+    actions = PENDING_KEYSET.page(actions, page, response)
+    
+    if fields:
+        return fields.response(actions, response)
+    return ACTION_ROWS.response(actions, response)
+
+
+async def _query_actions(
+    user_id: str,
+    status: Optional[ActionStatus],
+    meeting_id: Optional[str],
+    page: PageParams,
+    columns: Optional[List[str]]
+) -> List[dict]:
+    """Action items of the user's meetings matching the filters, newest first, with one row past the page"""
+    if postgres_enabled():
+        return await postgres.list_actions(
+            user_id, status.value if status else None, meeting_id,
+            after=page.position(), limit=page.limit + 1, columns=columns
+        )
     
-    query = supabase.table("action_items").select("*").in_("meeting_id", meeting_ids)
+    query = _user_rows("action_items", user_id, ", ".join(columns) if columns else "*")
     
     if status:
         query = query.eq("status", status.value)
     if meeting_id:
         query = query.eq("meeting_id", meeting_id)
     
-    response = query.order("created_at", desc=True).execute()
-    
-    return [ActionItemResponse(**action) for action in response.data]
+    result = await execute(NEWEST_FIRST_KEYSET.apply(query, page))
+    return _without_meeting(result.data)
+
+
+@router.get("", response_model=List[ActionItemResponse])
+async def get_all_actions(
+    request: Request,
+    response: Response,
+    status: Optional[ActionStatus] = None,
+    meeting_id: Optional[str] = None,
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(ActionItemResponse)),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get action items with optional filters, newest first, one page at a time. Supports If-None-Match."""
+    unchanged = await check_not_modified(request, lambda: _query_actions(user_id, status, meeting_id, page, VERSION_COLUMNS))
+    if unchanged:
+        return unchanged
+    
+    columns = fields.select_names("id", NEWEST_FIRST_KEYSET.column, *VERSION_COLUMNS) if fields else None
+    actions = await _query_actions(user_id, status, meeting_id, page, columns)
+    set_etag(response, rows_etag(request, actions))
+    actions = NEWEST_FIRST_KEYSET.page(actions, page, response)
+    
+    if fields:
+        return fields.response(actions, response)
+    return ACTION_ROWS.response(actions, response)
 
 
 @router.put("/{action_id}", response_model=ActionItemResponse)
@@ -66,7 +142,7 @@ async def update_action(
     supabase = get_supabase()
     
     # Verify action belongs to user's meeting
-    action_response = supabase.table("action_items").select("*, meetings!inner(user_id)").eq("id", action_id).execute()
+    action_response = await execute(supabase.table("action_items").select("*, meetings!inner(user_id)").eq("id", action_id))
     
     if not action_response.data or action_response.data[0]["meetings"]["user_id"] != user_id:
         raise HTTPException(
@@ -80,51 +156,38 @@ async def update_action(
     if not update_data:
         return ActionItemResponse(**action_response.data[0])
     
-    response = supabase.table("action_items").update(update_data).eq("id", action_id).execute()
+    response = await execute(supabase.table("action_items").update(update_data).eq("id", action_id))
+    meeting_id = action_response.data[0]["meeting_id"]
+    await detail_cache.invalidate(meeting_id, user_id)
+    
+    # Keep semantic search and questions on the edited text
+    if settings.SEMANTIC_INDEX_ENABLED and ITEM_SOURCES["action_items"][1] in update_data:
+        try:
+            await index_meeting(meeting_id)
+        except Exception as e:
+            print(f"Semantic indexing of meeting {meeting_id} failed: {e}")
     
     return ActionItemResponse(**response.data[0])
 
 
+async def _transition_action(action_id: str, user_id: str, target: ActionStatus) -> ActionItemResponse:
+    """Apply a status transition to one action item, with its audit record, in one round trip"""
+    updated = await transition_action_items([action_id], user_id, target)
+    
+    if not updated:
+        await raise_transition_error("action_items", action_id, user_id, target.value, "Action item")
+    
+    await detail_cache.invalidate(updated[0]["meeting_id"], user_id)
+    return ActionItemResponse(**updated[0])
+
+
 @router.post("/{action_id}/approve", response_model=ActionItemResponse)
 async def approve_action(
     action_id: str,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Approve an action item"""
-    supabase = get_supabase()
-    
-    # Verify action belongs to user
-    action_response = supabase.table("action_items").select("*, meetings!inner(user_id)").eq("id", action_id).execute()
-    
-    if not action_response.data or action_response.data[0]["meetings"]["user_id"] != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Action item not found"
-        )
-    
-    action = action_response.data[0]
-    
-    if action["status"] != "PENDING":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only pending actions can be approved"
-        )
-    
-    # Update status to approved
-    response = supabase.table("action_items").update({"status": "APPROVED"}).eq("id", action_id).execute()
-    
-    # Log audit trail
-    audit_data = {
-        "user_id": user_id,
-        "entity_type": "action_item",
-        "entity_id": action_id,
-        "action": "APPROVED",
-        "previous_value": {"status": "PENDING"},
-        "new_value": {"status": "APPROVED"}
-    }
-    supabase.table("audit_log").insert(audit_data).execute()
-    
-    return ActionItemResponse(**response.data[0])
+    """Approve a pending action item"""
+    return await _transition_action(action_id, user_id, ActionStatus.APPROVED)
 
 
 @router.post("/{action_id}/reject", response_model=ActionItemResponse)
@@ -132,33 +195,8 @@ async def reject_action(
     action_id: str,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Reject an action item"""
-    supabase = get_supabase()
-    
-    # Verify action belongs to user
-    action_response = supabase.table("action_items").select("*, meetings!inner(user_id)").eq("id", action_id).execute()
-    
-    if not action_response.data or action_response.data[0]["meetings"]["user_id"] != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Action item not found"
-        )
-    
-    # Update status to rejected
-    response = supabase.table("action_items").update({"status": "REJECTED"}).eq("id", action_id).execute()
-    
-    # Log audit trail
-    audit_data = {
-        "user_id": user_id,
-        "entity_type": "action_item",
-        "entity_id": action_id,
-        "action": "REJECTED",
-        "previous_value": {"status": action_response.data[0]["status"]},
-        "new_value": {"status": "REJECTED"}
-    }
-    supabase.table("audit_log").insert(audit_data).execute()
-    
-    return ActionItemResponse(**response.data[0])
+    """Reject a pending or approved action item"""
+    return await _transition_action(action_id, user_id, ActionStatus.REJECTED)
 
 
 @router.post("/{action_id}/complete", response_model=ActionItemResponse)
@@ -167,57 +205,81 @@ async def complete_action(
     user_id: str = Depends(get_current_user_id)
 ):
     """Mark an action item as completed"""
-    supabase = get_supabase()
-    
-    # Verify action belongs to user
-    action_response = supabase.table("action_items").select("*, meetings!inner(user_id)").eq("id", action_id).execute()
-    
-    if not action_response.data or action_response.data[0]["meetings"]["user_id"] != user_id:
+    return await _transition_action(action_id, user_id, ActionStatus.COMPLETED)
+
+
+@router.post("/bulk", response_model=BulkActionResponse)
+async def bulk_review_actions(
+    request: BulkActionRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Approve, reject or complete several action items at once
+    
+    Items are reviewed together in one database round trip; an item that
+    is not found or not in a state allowing its transition is reported in
+    the results without affecting the others.
+    """
+    counts = Counter(entry.id.lower() for entry in request.items)
+    duplicates = sorted(entity_id for entity_id, count in counts.items() if count > 1)
+    if duplicates:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Action item not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Duplicate action item IDs: {', '.join(duplicates)}"
         )
     
-    # Update status to completed
-    response = supabase.table("action_items").update({"status": "COMPLETED"}).eq("id", action_id).execute()
+    results = await review_action_items(
+        [(entry.id, entry.transition) for entry in request.items], user_id
+    )
     
-    # Log audit trail
-    audit_data = {
-        "user_id": user_id,
-        "entity_type": "action_item",
-        "entity_id": action_id,
-        "action": "COMPLETED",
-        "previous_value": {"status": action_response.data[0]["status"]},
-        "new_value": {"status": "COMPLETED"}
-    }
-    supabase.table("audit_log").insert(audit_data).execute()
+    meeting_ids = {result["action_item"]["meeting_id"] for result in results if result["action_item"]}
+    for meeting_id in meeting_ids:
+        await detail_cache.invalidate(meeting_id, user_id)
     
-    return ActionItemResponse(**response.data[0])
+    return BulkActionResponse(
+        updated=sum(1 for result in results if result["outcome"] == BulkOutcome.UPDATED.value),
+        results=results
+    )
+
+
+async def _query_follow_ups(
+    user_id: str,
+    status: Optional[FollowUpStatus],
+    page: PageParams,
+    columns: Optional[List[str]]
+) -> List[dict]:
+    """Follow-ups of the user's meetings, newest first, with one row past the page"""
+    query = _user_rows("follow_ups", user_id, ", ".join(columns) if columns else "*")
+    
+    if status:
+        query = query.eq("status", status.value)
+    
+    result = await execute(NEWEST_FIRST_KEYSET.apply(query, page))
+    return _without_meeting(result.data)
 
 
 @router.get("/followups", response_model=List[FollowUpResponse])
 async def get_follow_ups(
+    request: Request,
+    response: Response,
     status: Optional[FollowUpStatus] = None,
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(FollowUpResponse)),
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get all follow-up items"""
-    supabase = get_supabase()
-    
-    # Get all meetings for user
-    meetings_response = supabase.table("meetings").select("id").eq("user_id", user_id).execute()
-    meeting_ids = [m["id"] for m in meetings_response.data]
-    
-    if not meeting_ids:
-        return []
-    
-    query = supabase.table("follow_ups").select("*").in_("meeting_id", meeting_ids)
-    
-    if status:
-        query = query.eq("status", status.value)
-    
-    response = query.order("created_at", desc=True).execute()
-    
-    return [FollowUpResponse(**followup) for followup in response.data]
+    """Get follow-up items, newest first, one page at a time. Supports If-None-Match."""
+    unchanged = await check_not_modified(request, lambda: _query_follow_ups(user_id, status, page, VERSION_COLUMNS))
+    if unchanged:
+        return unchanged
+    
+    columns = fields.select_names("id", NEWEST_FIRST_KEYSET.column, *VERSION_COLUMNS) if fields else None
+    follow_ups = await _query_follow_ups(user_id, status, page, columns)
+    set_etag(response, rows_etag(request, follow_ups))
+    follow_ups = NEWEST_FIRST_KEYSET.page(follow_ups, page, response)
+    
+    if fields:
+        return fields.response(follow_ups, response)
+    return FOLLOW_UP_ROWS.response(follow_ups, response)
 
 
 @router.post("/followups/{followup_id}/complete", response_model=FollowUpResponse)
@@ -226,18 +288,10 @@ async def complete_follow_up(
     user_id: str = Depends(get_current_user_id)
 ):
     """Mark a follow-up as completed"""
-    supabase = get_supabase()
-    
-    # Verify follow-up belongs to user
-    followup_response = supabase.table("follow_ups").select("*, meetings!inner(user_id)").eq("id", followup_id).execute()
-    
-    if not followup_response.data or followup_response.data[0]["meetings"]["user_id"] != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Follow-up not found"
-        )
+    updated = await transition_follow_ups([followup_id], user_id, FollowUpStatus.COMPLETED)
     
-    # Update status
-    response = supabase.table("follow_ups").update({"status": "Completed"}).eq("id", followup_id).execute()
+    if not updated:
+        await raise_transition_error("follow_ups", followup_id, user_id, FollowUpStatus.COMPLETED.value, "Follow-up")
     
-    return FollowUpResponse(**response.data[0])
+    await detail_cache.invalidate(updated[0]["meeting_id"], user_id)
+    return FollowUpResponse(**updated[0])
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from app.models.user import UserCreate, UserLogin, Token, UserResponse
 from app.core.security import get_password_hash, verify_password, create_access_token
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
 from app.core.dependencies import get_current_user
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -24,7 +24,7 @@ async def register(user_data: UserCreate):
     supabase = get_supabase()
     
     # Check if user already exists
-    existing_user = supabase.table("users").select("*").eq("email", user_data.email).execute()
+    existing_user = await execute(supabase.table("users").select("*").eq("email", user_data.email))
     if existing_user.data and len(existing_user.data) > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -41,7 +41,7 @@ async def register(user_data: UserCreate):
         "full_name": user_data.full_name
     }
     
-    response = supabase.table("users").insert(new_user).execute()
+    response = await execute(supabase.table("users").insert(new_user))
     
     if not response.data or len(response.data) == 0:
         raise HTTPException(
@@ -82,7 +82,7 @@ async def login(credentials: UserLogin):
     supabase = get_supabase()
     
     # Find user by email
-    response = supabase.table("users").select("*").eq("email", credentials.email).execute()
+    response = await execute(supabase.table("users").select("*").eq("email", credentials.email))
     
     if not response.data or len(response.data) == 0:
         raise HTTPException(
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+from datetime import date, timedelta
+from app.models.dashboard import DashboardStats, ProjectMeetingCount
+from app.models.meeting import ActionStatus, FollowUpStatus
+from app.core.database import execute, get_supabase
+from app.core.dependencies import get_current_user_id
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@router.get("/stats", response_model=DashboardStats)
+async def get_dashboard_stats(user_id: str = Depends(get_current_user_id)):
+    """
+    Get the current user's dashboard counters
+    
+    Counters are maintained by database triggers as meetings, action items
+    and follow-ups change, so this reads a handful of rows whatever the
+    amount of data. Weeks start on Monday.
+    """
+    supabase = get_supabase()
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+    
+    # Every counter except past weeks, in one indexed lookup
+    result = await execute(
+        supabase.table("dashboard_counters")
+        .select("counter, scope, value")
+        .eq("user_id", user_id)
+        .or_(f"counter.in.(action_items,follow_ups,meetings,project_meetings),and(counter.eq.meetings_week,scope.eq.{week_start.isoformat()})")
+    )
+    
+    counters = {(row["counter"], row["scope"]): row["value"] for row in result.data}
+    
+    return DashboardStats(
+        pending_actions=counters.get(("action_items", ActionStatus.PENDING.value), 0),
+        approved_actions=counters.get(("action_items", ActionStatus.APPROVED.value), 0),
+        open_follow_ups=counters.get(("follow_ups", FollowUpStatus.TRACKED.value), 0),
+        total_meetings=counters.get(("meetings", ""), 0),
+        meetings_this_week=counters.get(("meetings_week", week_start.isoformat()), 0),
+        week_start=week_start,
+        meetings_per_project=[
+            ProjectMeetingCount(project_id=scope, meeting_count=value)
+            for (counter, scope), value in counters.items()
+            if counter == "project_meetings" and value > 0
+        ]
+    )
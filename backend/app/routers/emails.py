@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List
 from app.models.meeting import EmailDraftCreate, EmailDraftResponse
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
+from app.core.cache import detail_cache
 from app.core.dependencies import get_current_user_id
+from app.core.idempotency import IdempotentRequest, get_idempotent_request
 from app.services.email_service import send_email, generate_meeting_summary_email
 from datetime import datetime
 
@@ -18,7 +20,7 @@ async def create_email_draft(
     supabase = get_supabase()
     
     # Verify meeting belongs to user
-    meeting_response = supabase.table("meetings").select("*").eq("id", draft_data.meeting_id).eq("user_id", user_id).execute()
+    meeting_response = await execute(supabase.table("meetings").select("*").eq("id", draft_data.meeting_id).eq("user_id", user_id))
     
     if not meeting_response.data:
         raise HTTPException(
@@ -35,7 +37,7 @@ async def create_email_draft(
         "cc": draft_data.cc
     }
     
-    response = supabase.table("email_drafts").insert(new_draft).execute()
+    response = await execute(supabase.table("email_drafts").insert(new_draft))
     
     return EmailDraftResponse(**response.data[0])
 
@@ -49,7 +51,7 @@ async def get_meeting_email_draft(
     supabase = get_supabase()
     
     # Verify meeting belongs to user
-    meeting_response = supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id).execute()
+    meeting_response = await execute(supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id))
     
     if not meeting_response.data:
         raise HTTPException(
@@ -60,17 +62,17 @@ async def get_meeting_email_draft(
     meeting = meeting_response.data[0]
     
     # Check if draft already exists
-    draft_response = supabase.table("email_drafts").select("*").eq("meeting_id", meeting_id).execute()
+    draft_response = await execute(supabase.table("email_drafts").select("*").eq("meeting_id", meeting_id))
     
     if draft_response.data:
         return EmailDraftResponse(**draft_response.data[0])
     
     # Generate new draft
     # Get meeting details
-    decisions_response = supabase.table("decisions").select("*").eq("meeting_id", meeting_id).execute()
+    decisions_response = await execute(supabase.table("decisions").select("*").eq("meeting_id", meeting_id))
     decisions = [d["decision_text"] for d in decisions_response.data]
     
-    actions_response = supabase.table("action_items").select("*").eq("meeting_id", meeting_id).execute()
+    actions_response = await execute(supabase.table("action_items").select("*").eq("meeting_id", meeting_id))
     action_items = actions_response.data
     
     # Generate email body
@@ -89,7 +91,7 @@ async def get_meeting_email_draft(
         "recipients": meeting.get("attendees", [])
     }
     
-    response = supabase.table("email_drafts").insert(new_draft).execute()
+    response = await execute(supabase.table("email_drafts").insert(new_draft))
     
     return EmailDraftResponse(**response.data[0])
 
@@ -97,13 +99,18 @@ async def get_meeting_email_draft(
 @router.post("/{draft_id}/send", response_model=dict)
 async def send_email_draft(
     draft_id: str,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request)
 ):
-    """Send an email draft"""
+    """Send an email draft. Supports the Idempotency-Key header."""
+    return await idempotency.run(lambda: _send_email_draft(draft_id, user_id))
+
+
+async def _send_email_draft(draft_id: str, user_id: str) -> dict:
     supabase = get_supabase()
     
     # Get draft
-    draft_response = supabase.table("email_drafts").select("*, meetings!inner(user_id)").eq("id", draft_id).execute()
+    draft_response = await execute(supabase.table("email_drafts").select("*, meetings!inner(user_id)").eq("id", draft_id))
     
     if not draft_response.data or draft_response.data[0]["meetings"]["user_id"] != user_id:
         raise HTTPException(
@@ -133,15 +140,16 @@ async def send_email_draft(
             raise Exception("Failed to send email")
         
         # Update draft as sent
-        supabase.table("email_drafts").update({
+        await execute(supabase.table("email_drafts").update({
             "sent_at": datetime.utcnow().isoformat()
-        }).eq("id", draft_id).execute()
+        }).eq("id", draft_id))
         
         # Update related action item if exists
         if draft.get("action_item_id"):
-            supabase.table("action_items").update({
+            await execute(supabase.table("action_items").update({
                 "status": "EXECUTED"
-            }).eq("id", draft["action_item_id"]).execute()
+            }).eq("id", draft["action_item_id"]))
+            await detail_cache.invalidate(draft["meeting_id"], user_id)
         
         return {
             "message": "Email sent successfully",
@@ -1,19 +1,38 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Request, Response
 from typing import List, Optional
 from datetime import date
+from postgrest.exceptions import APIError
 from app.models.meeting import (
     MeetingCreate, MeetingUpdate, MeetingResponse, MeetingDetailResponse,
-    TranscriptResponse, DecisionResponse, ActionItemResponse, FollowUpResponse,
-    ProblemStatementResponse, MeetingType, MeetingStatus
+    MeetingType, MeetingStatus, TranscriptResponse, DecisionResponse,
+    ActionItemResponse, FollowUpResponse, ProblemStatementResponse
 )
-from app.core.database import get_supabase
+from app.models.qa import AskRequest
+from app.core.database import execute, get_supabase
+from app.core.cache import detail_cache
+from app.core import postgres
+from app.core.postgres import postgres_enabled
 from app.core.dependencies import get_current_user_id
-from app.services.storage import upload_audio_file
+from app.core.idempotency import IdempotentRequest, get_idempotent_request
+from app.core.pagination import Keyset, PageParams, get_page_params
+from app.core.fields import FieldSet, sparse_fields
+from app.core.etag import VERSION_COLUMNS, check_not_modified, conditional_json, rows_etag, set_etag
+from app.core.serialization import RowSerializer
+from app.services.storage import upload_audio_file, delete_meeting_audio
+from app.services.audio_stream import audio_response
 from app.services.transcription import transcribe_audio
 from app.services.intelligence import extract_intelligence
+from app.services.semantic_index import remove_meeting_from_index
+from app.services.qa import answer_question
 
 router = APIRouter(prefix="/api/meetings", tags=["Meetings"])
 
+MEETINGS_KEYSET = Keyset("meeting_date", desc=True)
+
+MEETING_ROWS = RowSerializer(MeetingResponse)
+MEETING_DETAIL_ROWS = RowSerializer(MeetingDetailResponse)
+
 
 @router.post("", response_model=MeetingResponse, status_code=status.HTTP_201_CREATED)
 async def create_meeting(
@@ -36,7 +55,7 @@ async def create_meeting(
         "status": MeetingStatus.SCHEDULED.value
     }
     
-    response = supabase.table("meetings").insert(new_meeting).execute()
+    response = await execute(supabase.table("meetings").insert(new_meeting))
     
     if not response.data or len(response.data) == 0:
         raise HTTPException(
@@ -47,18 +66,25 @@ async def create_meeting(
     return MeetingResponse(**response.data[0])
 
 
-@router.get("", response_model=List[MeetingResponse])
-async def get_meetings(
-    project_id: Optional[str] = None,
-    meeting_type: Optional[MeetingType] = None,
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    user_id: str = Depends(get_current_user_id)
-):
-    """Get all meetings for the current user with optional filters"""
+async def _query_meetings(
+    user_id: str,
+    project_id: Optional[str],
+    meeting_type: Optional[MeetingType],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    page: PageParams,
+    columns: Optional[List[str]]
+) -> List[dict]:
+    """Meetings of a user matching the filters, newest first, with one row past the page"""
+    if postgres_enabled():
+        return await postgres.list_meetings(
+            user_id, project_id, meeting_type.value if meeting_type else None, start_date, end_date,
+            after=page.position(), limit=page.limit + 1, columns=columns
+        )
+    
     supabase = get_supabase()
     
-    query = supabase.table("meetings").select("*").eq("user_id", user_id)
+    query = supabase.table("meetings").select(", ".join(columns) if columns else "*").eq("user_id", user_id)
     
     if project_id:
         query = query.eq("project_id", project_id)
@@ -69,69 +95,185 @@ async def get_meetings(
     if end_date:
         query = query.lte("meeting_date", str(end_date))
     
-    response = query.order("meeting_date", desc=True).execute()
+    result = await execute(MEETINGS_KEYSET.apply(query, page))
+    return result.data
+
+
+@router.get("", response_model=List[MeetingResponse])
+async def get_meetings(
+    request: Request,
+    response: Response,
+    project_id: Optional[str] = None,
+    meeting_type: Optional[MeetingType] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(MeetingResponse)),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get meetings for the current user with optional filters, newest first, one page at a time
+    
+    Supports If-None-Match: the page's row versions are checked before the
+    full rows are read.
+    """
+    filters = (user_id, project_id, meeting_type, start_date, end_date, page)
+    
+    unchanged = await check_not_modified(request, lambda: _query_meetings(*filters, columns=VERSION_COLUMNS))
+    if unchanged:
+        return unchanged
+    
+    columns = fields.select_names("id", MEETINGS_KEYSET.column, *VERSION_COLUMNS) if fields else None
+    meetings = await _query_meetings(*filters, columns=columns)
+    set_etag(response, rows_etag(request, meetings))
+    meetings = MEETINGS_KEYSET.page(meetings, page, response)
+    
+    if fields:
+        return fields.response(meetings, response)
+    return MEETING_ROWS.response(meetings, response)
+
+
+# Tables holding the data extracted from a meeting, embedded in the detail view.
+# Only the columns of their response models are selected, which leaves out
+# the full-text search vectors.
+MEETING_DETAIL_TABLES = {
+    "transcripts": ", ".join(TranscriptResponse.model_fields),
+    "decisions": ", ".join(DecisionResponse.model_fields),
+    "action_items": ", ".join(ActionItemResponse.model_fields),
+    "follow_ups": ", ".join(FollowUpResponse.model_fields),
+    "problem_statements": ", ".join(ProblemStatementResponse.model_fields)
+}
+
+# PostgREST errors for an embed it cannot resolve: no relationship in its
+# schema cache, or more than one candidate foreign key
+EMBED_UNAVAILABLE = ("PGRST200", "PGRST201")
+
+# Meeting, project and all extracted data as one PostgREST request
+MEETING_DETAIL_SELECT = "*, projects(name, color), " + ", ".join(
+    f"{table}({columns})" for table, columns in MEETING_DETAIL_TABLES.items()
+)
+
+
+async def _gather_meeting_detail(meeting_id: str, user_id: str) -> Optional[dict]:
+    """Fetch a meeting and its extracted data with concurrent queries"""
+    supabase = get_supabase()
+    
+    meeting_response, *table_responses = await asyncio.gather(
+        execute(supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id)),
+        *[
+            execute(supabase.table(table).select(columns).eq("meeting_id", meeting_id))
+            for table, columns in MEETING_DETAIL_TABLES.items()
+        ]
+    )
+    
+    if not meeting_response.data:
+        return None
+    
+    meeting = meeting_response.data[0]
+    for table, response in zip(MEETING_DETAIL_TABLES, table_responses):
+        meeting[table] = response.data
+    
+    # Get project info if exists
+    meeting["projects"] = None
+    if meeting.get("project_id"):
+        project_response = await execute(supabase.table("projects").select("name, color").eq("id", meeting["project_id"]))
+        if project_response.data:
+            meeting["projects"] = project_response.data[0]
+    
+    return meeting
+
+
+def _detail_select(fields: Optional[FieldSet]) -> str:
+    """PostgREST select for the meeting detail, limited to the requested fields"""
+    if fields is None:
+        return MEETING_DETAIL_SELECT
+    
+    parts = fields.select_names("id", allowed=MeetingResponse.model_fields)
+    if "project_name" in fields or "project_color" in fields:
+        parts.append("projects(name, color)")
+    for table, columns in MEETING_DETAIL_TABLES.items():
+        if (table if table != "transcripts" else "transcript") in fields:
+            parts.append(f"{table}({columns})")
+    
+    return ", ".join(parts)
+
+
+async def _fetch_meeting_detail(meeting_id: str, user_id: str, select: str = MEETING_DETAIL_SELECT) -> Optional[dict]:
+    """
+    Fetch a meeting and its extracted data through PostgREST
+    
+    Related rows are embedded through their foreign keys, so this is a single
+    round trip. If PostgREST cannot resolve the embeds (e.g. its schema
+    cache does not know the relationships yet), the queries are sent
+    concurrently instead; any other error propagates.
+    
+    Returns:
+        Meeting row with project_name, project_color and one list per
+        extracted-data table, or None if the user has no such meeting
+    """
+    supabase = get_supabase()
     
-    return [MeetingResponse(**meeting) for meeting in response.data]
+    try:
+        response = await execute(supabase.table("meetings").select(select).eq("id", meeting_id).eq("user_id", user_id))
+        meeting = response.data[0] if response.data else None
+    except APIError as e:
+        if e.code not in EMBED_UNAVAILABLE:
+            raise
+        meeting = await _gather_meeting_detail(meeting_id, user_id)
+    
+    if meeting is None:
+        return None
+    
+    project = meeting.pop("projects", None) or {}
+    meeting["project_name"] = project.get("name")
+    meeting["project_color"] = project.get("color")
+    
+    return meeting
 
 
 @router.get("/{meeting_id}", response_model=MeetingDetailResponse)
 async def get_meeting_detail(
     meeting_id: str,
+    request: Request,
+    fields: Optional[FieldSet] = Depends(sparse_fields(MeetingDetailResponse)),
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get complete meeting details with all extracted data"""
-    supabase = get_supabase()
-    
-    # Get meeting
-    meeting_response = supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id).execute()
-    
-    if not meeting_response.data or len(meeting_response.data) == 0:
+    """
+    Get complete meeting details with all extracted data
+    
+    Full responses are served from the meeting detail cache when present and
+    cached after a miss; sparse fieldsets always query the database. The
+    ETag is a hash of the serialized body, so a cached response answers
+    If-None-Match without a query or serialization.
+    """
+    cacheable = fields is None and detail_cache.enabled
+    if cacheable:
+        cached, version = await detail_cache.get(meeting_id, user_id)
+        if cached is not None:
+            return conditional_json(request, cached)
+    
+    if postgres_enabled():
+        meeting = await postgres.get_meeting_detail(meeting_id, user_id)
+    else:
+        meeting = await _fetch_meeting_detail(meeting_id, user_id, _detail_select(fields))
+    
+    if meeting is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meeting not found"
         )
     
-    meeting = meeting_response.data[0]
+    # A meeting has at most one transcript
+    transcripts = meeting.pop("transcripts", [])
+    meeting["transcript"] = transcripts[0] if transcripts else None
     
-    # Get project info if exists
-    project_name = None
-    project_color = None
-    if meeting.get("project_id"):
-        project_response = supabase.table("projects").select("name, color").eq("id", meeting["project_id"]).execute()
-        if project_response.data:
-            project_name = project_response.data[0]["name"]
-            project_color = project_response.data[0]["color"]
-    
-    # Get transcript
-    transcript_response = supabase.table("transcripts").select("*").eq("meeting_id", meeting_id).execute()
-    transcript = TranscriptResponse(**transcript_response.data[0]) if transcript_response.data else None
-    
-    # Get decisions
-    decisions_response = supabase.table("decisions").select("*").eq("meeting_id", meeting_id).execute()
-    decisions = [DecisionResponse(**d) for d in decisions_response.data]
-    
-    # Get action items
-    actions_response = supabase.table("action_items").select("*").eq("meeting_id", meeting_id).execute()
-    action_items = [ActionItemResponse(**a) for a in actions_response.data]
-    
-    # Get follow-ups
-    followups_response = supabase.table("follow_ups").select("*").eq("meeting_id", meeting_id).execute()
-    follow_ups = [FollowUpResponse(**f) for f in followups_response.data]
-    
-    # Get problem statements
-    problems_response = supabase.table("problem_statements").select("*").eq("meeting_id", meeting_id).execute()
-    problem_statements = [ProblemStatementResponse(**p) for p in problems_response.data]
-    
-    return MeetingDetailResponse(
-        **meeting,
-        transcript=transcript,
-        decisions=decisions,
-        action_items=action_items,
-        follow_ups=follow_ups,
-        problem_statements=problem_statements,
-        project_name=project_name,
-        project_color=project_color
-    )
+    if fields:
+        return conditional_json(request, fields.response(meeting).body)
+    
+    body = MEETING_DETAIL_ROWS.dumps(meeting)
+    if cacheable:
+        await detail_cache.put(meeting_id, user_id, body, version)
+    return conditional_json(request, body)
 
 
 @router.put("/{meeting_id}", response_model=MeetingResponse)
@@ -144,7 +286,7 @@ async def update_meeting(
     supabase = get_supabase()
     
     # Check if meeting exists
-    existing = supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id).execute()
+    existing = await execute(supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id))
     
     if not existing.data or len(existing.data) == 0:
         raise HTTPException(
@@ -164,7 +306,8 @@ async def update_meeting(
     if not update_data:
         return MeetingResponse(**existing.data[0])
     
-    response = supabase.table("meetings").update(update_data).eq("id", meeting_id).execute()
+    response = await execute(supabase.table("meetings").update(update_data).eq("id", meeting_id))
+    await detail_cache.invalidate(meeting_id, user_id)
     
     return MeetingResponse(**response.data[0])
 
@@ -178,7 +321,7 @@ async def delete_meeting(
     supabase = get_supabase()
     
     # Check if meeting exists
-    existing = supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id).execute()
+    existing = await execute(supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id))
     
     if not existing.data or len(existing.data) == 0:
         raise HTTPException(
@@ -187,7 +330,15 @@ async def delete_meeting(
         )
     
     # Delete meeting (cascade will handle related records)
-    supabase.table("meetings").delete().eq("id", meeting_id).execute()
+    await execute(supabase.table("meetings").delete().eq("id", meeting_id))
+    await detail_cache.invalidate(meeting_id, user_id)
+    
+    # Storage and the semantic index are not covered by the cascade
+    await delete_meeting_audio(existing.data[0])
+    try:
+        await remove_meeting_from_index(meeting_id)
+    except Exception as e:
+        print(f"Removing meeting {meeting_id} from the semantic index failed: {e}")
     
     return None
 
@@ -196,13 +347,18 @@ async def delete_meeting(
 async def upload_meeting_audio(
     meeting_id: str,
     file: UploadFile = File(...),
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request)
 ):
-    """Upload audio file for a meeting"""
+    """Upload audio file for a meeting. Supports the Idempotency-Key header."""
+    return await idempotency.run(lambda: _upload_meeting_audio(meeting_id, file, user_id))
+
+
+async def _upload_meeting_audio(meeting_id: str, file: UploadFile, user_id: str) -> dict:
     supabase = get_supabase()
     
     # Check if meeting exists
-    meeting_response = supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id).execute()
+    meeting_response = await execute(supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id))
     
     if not meeting_response.data or len(meeting_response.data) == 0:
         raise HTTPException(
@@ -212,7 +368,9 @@ async def upload_meeting_audio(
     
     # Upload audio file
     try:
-        file_path, file_url = await upload_audio_file(file, meeting_id)
+        audio = await upload_audio_file(file, meeting_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -220,28 +378,69 @@ async def upload_meeting_audio(
         )
     
     # Update meeting with audio file info
-    supabase.table("meetings").update({
-        "audio_file_path": file_path,
-        "audio_file_url": file_url
-    }).eq("id", meeting_id).execute()
+    await execute(supabase.table("meetings").update(audio.meeting_fields()).eq("id", meeting_id))
+    await detail_cache.invalidate(meeting_id, user_id)
+    
+    # Remove the audio this upload replaced
+    await delete_meeting_audio(meeting_response.data[0])
     
     return {
         "message": "Audio uploaded successfully",
-        "file_path": file_path,
-        "file_url": file_url
+        "file_path": audio.file_path,
+        "file_url": audio.public_url,
+        "file_size": audio.size,
+        "sha256": audio.sha256
     }
 
 
+@router.get("/{meeting_id}/audio")
+async def stream_meeting_audio(
+    meeting_id: str,
+    request: Request,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Stream a meeting's audio
+    
+    Supports Range requests (206 Partial Content) so players can seek
+    without downloading the whole file, plus ETag / Last-Modified
+    validators for conditional requests.
+    """
+    supabase = get_supabase()
+    
+    meeting_response = await execute(supabase.table("meetings").select("audio_file_path").eq("id", meeting_id).eq("user_id", user_id))
+    
+    if not meeting_response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meeting not found"
+        )
+    
+    file_path = meeting_response.data[0].get("audio_file_path")
+    if not file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No audio file uploaded for this meeting"
+        )
+    
+    return await audio_response(request, file_path)
+
+
 @router.post("/{meeting_id}/process", response_model=dict)
 async def process_meeting(
     meeting_id: str,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request)
 ):
-    """Process meeting audio: transcribe and extract intelligence"""
+    """Process meeting audio: transcribe and extract intelligence. Supports the Idempotency-Key header."""
+    return await idempotency.run(lambda: _process_meeting(meeting_id, user_id))
+
+
+async def _process_meeting(meeting_id: str, user_id: str) -> dict:
     supabase = get_supabase()
     
     # Get meeting
-    meeting_response = supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id).execute()
+    meeting_response = await execute(supabase.table("meetings").select("*").eq("id", meeting_id).eq("user_id", user_id))
     
     if not meeting_response.data or len(meeting_response.data) == 0:
         raise HTTPException(
@@ -265,7 +464,7 @@ async def process_meeting(
         await extract_intelligence(meeting_id, transcript_id)
         
         # Update meeting status
-        supabase.table("meetings").update({"status": MeetingStatus.COMPLETED.value}).eq("id", meeting_id).execute()
+        await execute(supabase.table("meetings").update({"status": MeetingStatus.COMPLETED.value}).eq("id", meeting_id))
         
         return {
             "message": "Meeting processed successfully",
@@ -277,3 +476,33 @@ async def process_meeting(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process meeting: {str(e)}"
         )
+    finally:
+        # Partial results of a failed run are visible too
+        await detail_cache.invalidate(meeting_id, user_id)
+
+
+@router.post("/{meeting_id}/ask")
+async def ask_meeting(
+    meeting_id: str,
+    request: AskRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Ask a question about a meeting
+    
+    Only the passages most relevant to the question are sent to the model;
+    the answer is streamed back as plain text.
+    """
+    supabase = get_supabase()
+    
+    response = await execute(
+        supabase.table("meetings").select("id, title, meeting_date").eq("id", meeting_id).eq("user_id", user_id)
+    )
+    
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meeting not found"
+        )
+    
+    return await answer_question(request.question, user_id, response.data)
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+from typing import List, Optional
 from app.models.project import ProjectCreate, ProjectUpdate, ProjectResponse
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
+from app.core.cache import detail_cache
 from app.core.dependencies import get_current_user_id
+from app.core.pagination import Keyset, PageParams, get_page_params
+from app.core.fields import FieldSet, sparse_fields
+from app.core.etag import VERSION_COLUMNS, check_not_modified, etag_matches, not_modified, rows_etag, set_etag
+from app.core.serialization import RowSerializer
+from app.models.qa import AskRequest
+from app.services.qa import answer_question
 
 router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
+PROJECTS_KEYSET = Keyset("created_at", desc=True)
+
+PROJECT_ROWS = RowSerializer(ProjectResponse)
+
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
@@ -22,7 +33,7 @@ async def create_project(
         "color": project_data.color
     }
     
-    response = supabase.table("projects").insert(new_project).execute()
+    response = await execute(supabase.table("projects").insert(new_project))
     
     if not response.data or len(response.data) == 0:
         raise HTTPException(
@@ -33,33 +44,70 @@ async def create_project(
     return ProjectResponse(**response.data[0])
 
 
-@router.get("", response_model=List[ProjectResponse])
-async def get_projects(user_id: str = Depends(get_current_user_id)):
-    """Get all projects for the current user"""
+async def _query_projects(user_id: str, page: PageParams, columns: str) -> List[dict]:
+    """Projects of a user, newest first, with one row past the page"""
     supabase = get_supabase()
-    
-    response = supabase.table("projects").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-    
-    return [ProjectResponse(**project) for project in response.data]
+    query = supabase.table("projects").select(columns).eq("user_id", user_id)
+    result = await execute(PROJECTS_KEYSET.apply(query, page))
+    return result.data
+
+
+@router.get("", response_model=List[ProjectResponse])
+async def get_projects(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(ProjectResponse)),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get projects for the current user, newest first, one page at a time. Supports If-None-Match."""
+    unchanged = await check_not_modified(request, lambda: _query_projects(user_id, page, ", ".join(VERSION_COLUMNS)))
+    if unchanged:
+        return unchanged
+    
+    columns = fields.columns("id", PROJECTS_KEYSET.column, *VERSION_COLUMNS) if fields else "*"
+    projects = await _query_projects(user_id, page, columns)
+    set_etag(response, rows_etag(request, projects))
+    projects = PROJECTS_KEYSET.page(projects, page, response)
+    
+    if fields:
+        return fields.response(projects, response)
+    return PROJECT_ROWS.response(projects, response)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[FieldSet] = Depends(sparse_fields(ProjectResponse)),
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get a specific project by ID"""
+    """
+    Get a specific project by ID
+    
+    Supports If-None-Match. The row is small, so its version is checked
+    after the one query rather than with a separate one.
+    """
     supabase = get_supabase()
     
-    response = supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user_id).execute()
+    columns = fields.columns(*VERSION_COLUMNS) if fields else "*"
+    result = await execute(supabase.table("projects").select(columns).eq("id", project_id).eq("user_id", user_id))
     
-    if not response.data or len(response.data) == 0:
+    if not result.data or len(result.data) == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    return ProjectResponse(**response.data[0])
+    etag = rows_etag(request, result.data)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    if fields:
+        return fields.response(result.data[0], response)
+    return PROJECT_ROWS.response(result.data[0], response)
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -72,7 +120,7 @@ async def update_project(
     supabase = get_supabase()
     
     # Check if project exists and belongs to user
-    existing = supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user_id).execute()
+    existing = await execute(supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user_id))
     
     if not existing.data or len(existing.data) == 0:
         raise HTTPException(
@@ -86,7 +134,9 @@ async def update_project(
     if not update_data:
         return ProjectResponse(**existing.data[0])
     
-    response = supabase.table("projects").update(update_data).eq("id", project_id).execute()
+    response = await execute(supabase.table("projects").update(update_data).eq("id", project_id))
+    # Meeting details include the project name and color
+    await detail_cache.invalidate_user(user_id)
     
     return ProjectResponse(**response.data[0])
 
@@ -100,7 +150,7 @@ async def delete_project(
     supabase = get_supabase()
     
     # Check if project exists and belongs to user
-    existing = supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user_id).execute()
+    existing = await execute(supabase.table("projects").select("*").eq("id", project_id).eq("user_id", user_id))
     
     if not existing.data or len(existing.data) == 0:
         raise HTTPException(
@@ -108,6 +158,35 @@ async def delete_project(
             detail="Project not found"
         )
     
-    supabase.table("projects").delete().eq("id", project_id).execute()
+    await execute(supabase.table("projects").delete().eq("id", project_id))
+    await detail_cache.invalidate_user(user_id)
     
     return None
+
+
+@router.post("/{project_id}/ask")
+async def ask_project(
+    project_id: str,
+    request: AskRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Ask a question across all meetings of a project
+    
+    The passages most relevant to the question are picked from every meeting,
+    so the prompt stays the same size however many meetings the project has.
+    The answer is streamed back as plain text.
+    """
+    supabase = get_supabase()
+    
+    response = await execute(
+        supabase.table("projects").select("id, meetings(id, title, meeting_date)").eq("id", project_id).eq("user_id", user_id)
+    )
+    
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    return await answer_question(request.question, user_id, response.data[0]["meetings"])
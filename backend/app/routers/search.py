@@ -0,0 +1,84 @@
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
+from typing import List
+from app.models.search import SearchResult, SemanticSearchResult
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+from app.core.dependencies import get_current_user_id
+from app.core.pagination import NEXT_CURSOR_HEADER, PageParams, encode_cursor, get_page_params
+from app.services.semantic_index import semantic_search
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+
+@router.get("", response_model=List[SearchResult])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500, description="Search terms (quotes, OR and -term are supported)"),
+    page: PageParams = Depends(get_page_params),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Search transcripts, decisions, action items and problem statements
+    
+    Results are ranked by relevance, best first, with highlighted snippets,
+    one page at a time.
+    """
+    rank, after_id = page.position()
+    try:
+        after_rank = float(rank) if after_id is not None else None
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    
+    supabase = get_supabase()
+    result = await execute(supabase.rpc("search_meetings", {
+        "p_user_id": user_id,
+        "p_query": q,
+        # One extra row tells whether there is a next page
+        "p_limit": page.limit + 1,
+        "p_after_rank": after_rank,
+        "p_after_id": after_id
+    }))
+    
+    results = result.data
+    if len(results) > page.limit:
+        results = results[:page.limit]
+        last = results[-1]
+        # The rank goes through the cursor as text, so it compares equal when sent back
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(str(last["rank"]), last["id"])
+    
+    return [SearchResult(**row) for row in results]
+
+
+@router.get("/semantic", response_model=List[SemanticSearchResult])
+async def search_by_meaning(
+    q: str = Query(..., min_length=1, max_length=500),
+    k: int = Query(10, ge=1, le=50, description="Number of results"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Find transcript passages and extracted items closest in meaning to a query
+    
+    Uses the local semantic index, which also matches related wordings that
+    keyword search misses.
+    """
+    if not settings.SEMANTIC_INDEX_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Semantic search is disabled"
+        )
+    
+    chunks = await semantic_search(user_id, q, k)
+    
+    return [
+        SemanticSearchResult(
+            source=chunk["source"],
+            id=chunk["source_id"],
+            meeting_id=chunk["meeting_id"],
+            score=chunk["score"],
+            text=chunk["text"]
+        )
+        for chunk in chunks
+    ]
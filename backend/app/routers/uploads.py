@@ -0,0 +1,183 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Request, Response
+from app.models.upload import (
+    ResumableUploadCreate, ResumableUploadResponse,
+    SignedUploadCreate, SignedUploadResponse, SignedUploadComplete
+)
+from app.core.database import execute, get_supabase
+from app.core.cache import detail_cache
+from app.core.dependencies import get_current_user_id
+from app.services.uploads import (
+    create_upload_session, get_upload_session, append_chunk, complete_upload, SESSION_COMPLETED
+)
+from app.services.storage import (
+    StoredAudio, create_signed_audio_upload, delete_meeting_audio, is_meeting_audio_path, verify_uploaded_audio
+)
+
+router = APIRouter(prefix="/api/meetings", tags=["Uploads"])
+
+OFFSET_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+async def _get_meeting(meeting_id: str, user_id: str) -> dict:
+    supabase = get_supabase()
+    meeting_response = await execute(supabase.table("meetings").select(
+        "id, audio_file_path, audio_original_path"
+    ).eq("id", meeting_id).eq("user_id", user_id))
+    
+    if not meeting_response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meeting not found"
+        )
+    
+    return meeting_response.data[0]
+
+
+async def _attach_audio(meeting: dict, audio: StoredAudio, user_id: str) -> None:
+    """Point the meeting at new audio and remove the audio it replaced"""
+    supabase = get_supabase()
+    await execute(supabase.table("meetings").update(audio.meeting_fields()).eq("id", meeting["id"]))
+    await detail_cache.invalidate(meeting["id"], user_id)
+    await delete_meeting_audio(meeting)
+
+
+def _session_response(session: dict) -> ResumableUploadResponse:
+    return ResumableUploadResponse(**session)
+
+
+@router.post("/{meeting_id}/uploads", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_resumable_upload(
+    meeting_id: str,
+    upload_data: ResumableUploadCreate,
+    response: Response,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Start a resumable audio upload for a meeting"""
+    await _get_meeting(meeting_id, user_id)
+    
+    session = await create_upload_session(meeting_id, user_id, upload_data.filename, upload_data.size)
+    
+    response.headers["Location"] = f"{router.prefix}/{meeting_id}/uploads/{session['id']}"
+    return _session_response(session)
+
+
+@router.head("/{meeting_id}/uploads/{upload_id}")
+async def get_resumable_upload_offset(
+    meeting_id: str,
+    upload_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get the current offset of a resumable upload in the Upload-Offset header"""
+    session = _session_response(await get_upload_session(upload_id, meeting_id, user_id))
+    
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            "Upload-Offset": str(session.offset),
+            "Upload-Length": str(session.size),
+            "Cache-Control": "no-store"
+        }
+    )
+
+
+@router.get("/{meeting_id}/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def get_resumable_upload(
+    meeting_id: str,
+    upload_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get a resumable upload session"""
+    return _session_response(await get_upload_session(upload_id, meeting_id, user_id))
+
+
+@router.patch("/{meeting_id}/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def upload_chunk(
+    meeting_id: str,
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    content_type: str = Header(..., alias="Content-Type"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Append a chunk to a resumable upload
+    
+    The request body is written at Upload-Offset, which must equal the
+    current offset (see HEAD). When the last byte arrives the file is moved
+    to storage and attached to the meeting, replacing any previous audio.
+    """
+    if content_type != OFFSET_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be {OFFSET_CONTENT_TYPE}"
+        )
+    
+    session = await get_upload_session(upload_id, meeting_id, user_id)
+    offset, complete = await append_chunk(session, upload_offset, request.stream())
+    response.headers["Upload-Offset"] = str(offset)
+    
+    if not complete:
+        return _session_response({**session, "offset": offset})
+    
+    meeting = await _get_meeting(meeting_id, user_id)
+    audio = await complete_upload(session)
+    
+    # Hand off to the meeting's audio fields, as a direct upload would
+    await _attach_audio(meeting, audio, user_id)
+    
+    return ResumableUploadResponse(**{
+        **session,
+        "offset": offset,
+        "status": SESSION_COMPLETED,
+        "file_path": audio.file_path
+    })
+
+
+@router.post("/{meeting_id}/audio/signed-upload", response_model=SignedUploadResponse)
+async def create_signed_upload(
+    meeting_id: str,
+    upload_data: SignedUploadCreate,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Get a short-lived signed URL to upload audio directly to storage
+    
+    Upload the file with PUT to signed_url, then call the completion
+    endpoint with file_path to attach it to the meeting.
+    """
+    await _get_meeting(meeting_id, user_id)
+    
+    return SignedUploadResponse(**await create_signed_audio_upload(meeting_id, upload_data.filename))
+
+
+@router.post("/{meeting_id}/audio/signed-upload/complete", response_model=dict)
+async def complete_signed_upload(
+    meeting_id: str,
+    upload_data: SignedUploadComplete,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Attach audio uploaded through a signed URL to the meeting"""
+    meeting = await _get_meeting(meeting_id, user_id)
+    
+    if not is_meeting_audio_path(upload_data.file_path, meeting_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File path does not belong to this meeting"
+        )
+    
+    if upload_data.file_path == meeting.get("audio_file_path"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This file is already attached to the meeting"
+        )
+    
+    audio = await verify_uploaded_audio(upload_data.file_path)
+    await _attach_audio(meeting, audio, user_id)
+    
+    return {
+        "message": "Audio uploaded successfully",
+        "file_path": audio.file_path,
+        "file_url": audio.public_url,
+        "file_size": audio.size
+    }
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Set
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+from app.services.storage_backends import get_storage_backend
+
+# Storage folders holding meeting audio
+AUDIO_PREFIXES = ("meetings", "originals")
+
+
+async def referenced_audio_paths(page_size: int = 1000) -> Set[str]:
+    """
+    Collect every storage path still referenced by a meeting
+
+    Meetings are read in keyset pages ordered by ID (each page continues
+    after the last ID seen, so deletions during the scan cannot shift a
+    meeting out of view), selecting only the audio path columns.
+    """
+    supabase = get_supabase()
+    referenced = set()
+    last_id = None
+
+    while True:
+        query = supabase.table("meetings").select("id, audio_file_path, audio_original_path")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        response = await execute(query.order("id").limit(page_size))
+
+        for meeting in response.data:
+            for column in ("audio_file_path", "audio_original_path"):
+                if meeting.get(column):
+                    referenced.add(meeting[column])
+
+        if len(response.data) < page_size:
+            return referenced
+        last_id = response.data[-1]["id"]
+
+
+async def still_referenced(paths: List[str]) -> Set[str]:
+    """Those of the paths a meeting references right now"""
+    supabase = get_supabase()
+    referenced = set()
+    for column in ("audio_file_path", "audio_original_path"):
+        response = await execute(supabase.table("meetings").select(column).in_(column, paths))
+        referenced.update(meeting[column] for meeting in response.data)
+    return referenced
+
+
+async def find_orphaned_audio(referenced: Set[str], page_size: int, min_age: timedelta) -> List[str]:
+    """
+    List bucket objects in pages and return those no meeting references
+
+    Objects younger than min_age are skipped: they may belong to an upload
+    that has not been attached to its meeting yet.
+    """
+    backend = get_storage_backend()
+    cutoff = datetime.now(timezone.utc) - min_age
+    orphans = []
+
+    for prefix in AUDIO_PREFIXES:
+        offset = 0
+        while True:
+            page = await backend.list_objects(prefix, limit=page_size, offset=offset)
+            for obj in page:
+                too_recent = obj.created_at is None or obj.created_at > cutoff
+                if obj.path not in referenced and not too_recent:
+                    orphans.append(obj.path)
+
+            if len(page) < page_size:
+                break
+            offset += page_size
+
+    return orphans
+
+
+async def collect_orphaned_audio(
+    dry_run: bool = False,
+    page_size: int = 1000,
+    delete_batch_size: int = 100,
+    max_deletes_per_second: float = 50.0,
+    min_age_hours: float = 24.0
+) -> dict:
+    """
+    Delete audio objects that no meeting references any more
+
+    Orphans come from deleted meetings, replaced audio and abandoned
+    uploads. All orphans are identified before anything is deleted, so
+    deletions never shift the pages being listed, and each batch is checked
+    against the meetings table again right before it is deleted.
+
+    Args:
+        dry_run: Only report what would be deleted
+        page_size: Rows / objects fetched per page
+        delete_batch_size: Objects removed per storage request
+        max_deletes_per_second: Upper bound on the deletion rate
+        min_age_hours: Grace period for objects of in-progress uploads
+
+    Returns:
+        Summary with the number of referenced paths and orphans found / deleted
+    """
+    # Read references before listing, so anything attached after this
+    # point is younger than the grace period or already referenced
+    referenced = await referenced_audio_paths(page_size)
+    orphans = await find_orphaned_audio(referenced, page_size, timedelta(hours=min_age_hours))
+
+    deleted = 0
+    if not dry_run:
+        backend = get_storage_backend()
+        for start in range(0, len(orphans), delete_batch_size):
+            batch = orphans[start:start + delete_batch_size]
+            started = time.monotonic()
+            # Skip anything attached to a meeting since the scan
+            referenced_now = await still_referenced(batch)
+            batch = [path for path in batch if path not in referenced_now]
+            if batch:
+                await backend.delete(batch)
+            deleted += len(batch)
+
+            # Rate limit: a batch of n deletes takes at least n / rate seconds
+            remaining = len(batch) / max_deletes_per_second - (time.monotonic() - started)
+            if remaining > 0 and deleted < len(orphans):
+                await asyncio.sleep(remaining)
+
+    summary = {
+        "referenced": len(referenced),
+        "orphaned": len(orphans),
+        "deleted": deleted,
+        "dry_run": dry_run
+    }
+    print(f"Audio garbage collection: {summary}")
+    if dry_run and orphans:
+        for path in orphans:
+            print(f"  would delete {path}")
+
+    return summary
+
+
+async def run_scheduled_collection() -> dict:
+    """Collection run used by the periodic background job"""
+    return await collect_orphaned_audio(dry_run=settings.AUDIO_GC_DRY_RUN)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete audio objects no meeting references")
+    parser.add_argument("--dry-run", action="store_true", help="Only list orphaned objects")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=50.0, help="Maximum deletes per second")
+    parser.add_argument("--min-age-hours", type=float, default=24.0)
+    args = parser.parse_args()
+
+    asyncio.run(collect_orphaned_audio(
+        dry_run=args.dry_run,
+        page_size=args.page_size,
+        delete_batch_size=args.batch_size,
+        max_deletes_per_second=args.rate,
+        min_age_hours=args.min_age_hours
+    ))
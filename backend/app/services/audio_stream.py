@@ -0,0 +1,130 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from app.core.etag import etag_matches
+from app.services.storage_backends import ObjectStat, get_storage_backend
+
+
+def _etag(file_path: str, stat: ObjectStat) -> str:
+    if stat.etag:
+        # Ranges are only served for strong validators
+        return stat.etag[2:] if stat.etag.startswith("W/") else stat.etag
+    raw = f"{file_path}:{stat.size}:{stat.last_modified.timestamp() if stat.last_modified else ''}"
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Value of the Range header
+        size: Size of the resource in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole
+        resource (no header, unsupported unit, or multiple ranges)
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            suffix = int(end_text)
+            if suffix == 0:
+                raise ValueError
+            start = max(size - suffix, 0)
+            end = size - 1
+    except ValueError:
+        start, end = size, size  # Malformed: treated as unsatisfiable
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    return start, min(end, size - 1)
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if request.headers.get("if-none-match") is not None:
+        return etag_matches(request, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+async def audio_response(request: Request, file_path: str) -> Response:
+    """
+    Serve a stored audio file with Range, ETag and Last-Modified support
+
+    Args:
+        request: Incoming request (Range and conditional headers are read from it)
+        file_path: Path of the audio file in the storage backend
+
+    Returns:
+        304, 206 with the requested range, or 200 with the whole file
+    """
+    backend = get_storage_backend()
+    stat = await backend.stat(file_path)
+
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+
+    etag = _etag(file_path, stat)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "private, max-age=0, must-revalidate"
+    }
+    if stat.last_modified:
+        headers["Last-Modified"] = format_datetime(stat.last_modified, usegmt=True)
+
+    if _not_modified(request, etag, stat.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    media_type = stat.content_type or "application/octet-stream"
+
+    # If-Range: only honour Range if the client's copy is still current
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if if_range is None or if_range == etag:
+        byte_range = parse_range(request.headers.get("range"), stat.size)
+
+    if byte_range is None:
+        local_path = backend.local_path(file_path)
+        if local_path:
+            # Lets the server send the file with zero-copy where supported
+            return FileResponse(local_path, media_type=media_type, headers=headers)
+
+        headers["Content-Length"] = str(stat.size)
+        return StreamingResponse(backend.get_stream(file_path), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        backend.iter_range(file_path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
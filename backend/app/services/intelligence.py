@@ -1,6 +1,7 @@
 from groq import Groq
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
 from app.core.config import settings
+from app.services.semantic_index import index_meeting
 from typing import List, Dict
 import json
 
@@ -19,7 +20,7 @@ async def extract_intelligence(meeting_id: str, transcript_id: str):
     supabase = get_supabase()
     
     # Get transcript
-    transcript_response = supabase.table("transcripts").select("*").eq("id", transcript_id).execute()
+    transcript_response = await execute(supabase.table("transcripts").select("*").eq("id", transcript_id))
     
     if not transcript_response.data:
         raise Exception("Transcript not found")
@@ -40,6 +41,13 @@ async def extract_intelligence(meeting_id: str, transcript_id: str):
     await store_action_items(meeting_id, action_items)
     await store_follow_ups(meeting_id, follow_ups)
     await store_problem_statements(meeting_id, problem_statements)
+    
+    # Make the new content searchable by meaning; the extraction itself succeeded
+    if settings.SEMANTIC_INDEX_ENABLED:
+        try:
+            await index_meeting(meeting_id)
+        except Exception as e:
+            print(f"Semantic indexing of meeting {meeting_id} failed: {e}")
 
 
 async def extract_decisions(transcript: str) -> List[Dict]:
@@ -228,7 +236,7 @@ async def store_decisions(meeting_id: str, decisions: List[Dict]):
             "decision_text": decision.get("decision", ""),
             "confidence_score": decision.get("confidence", 0.0)
         }
-        supabase.table("decisions").insert(decision_data).execute()
+        await execute(supabase.table("decisions").insert(decision_data))
 
 
 async def store_action_items(meeting_id: str, action_items: List[Dict]):
@@ -245,7 +253,7 @@ async def store_action_items(meeting_id: str, action_items: List[Dict]):
             "status": "PENDING",
             "confidence_score": item.get("confidence", 0.0)
         }
-        supabase.table("action_items").insert(action_data).execute()
+        await execute(supabase.table("action_items").insert(action_data))
 
 
 async def store_follow_ups(meeting_id: str, follow_ups: List[Dict]):
@@ -259,7 +267,7 @@ async def store_follow_ups(meeting_id: str, follow_ups: List[Dict]):
             "status": "Tracked",
             "confidence_score": item.get("confidence", 0.0)
         }
-        supabase.table("follow_ups").insert(followup_data).execute()
+        await execute(supabase.table("follow_ups").insert(followup_data))
 
 
 async def store_problem_statements(meeting_id: str, problems: List[Dict]):
@@ -272,4 +280,4 @@ async def store_problem_statements(meeting_id: str, problems: List[Dict]):
             "statement": problem.get("statement", ""),
             "confidence_score": problem.get("confidence", 0.0)
         }
-        supabase.table("problem_statements").insert(problem_data).execute()
+        await execute(supabase.table("problem_statements").insert(problem_data))
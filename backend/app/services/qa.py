@@ -0,0 +1,111 @@
+import anyio
+from typing import Dict, Iterable, Iterator, List
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.services.intelligence import groq_client
+from app.services.semantic_index import semantic_search
+
+NO_CONTEXT_ANSWER = "I couldn't find anything about that in these meetings."
+
+SYSTEM_PROMPT = (
+    "You answer questions about meetings using only the excerpts provided. "
+    "Mention which meeting each point comes from. If the excerpts do not "
+    "contain the answer, say so instead of guessing."
+)
+
+
+def build_prompt(question: str, chunks: List[dict], meetings: Dict[str, dict]) -> str:
+    """
+    Prompt with the retrieved excerpts, best first, within ASK_CONTEXT_CHARS
+    
+    The size is bounded by the number of excerpts and the character budget,
+    never by how many meetings were searched.
+    """
+    budget = settings.ASK_CONTEXT_CHARS
+    excerpts = []
+    
+    for chunk in chunks:
+        meeting = meetings[chunk["meeting_id"]]
+        header = f"[{meeting['title']} ({meeting['meeting_date']}), {chunk['source'].replace('_', ' ')}]"
+        text = chunk["text"][:max(budget - len(header) - 1, 0)]
+        if not text:
+            break
+        excerpts.append(f"{header}\n{text}")
+        budget -= len(header) + 1 + len(text)
+    
+    return "Meeting excerpts:\n\n" + "\n\n".join(excerpts) + f"\n\nQuestion: {question}"
+
+
+async def _open_completion(prompt: str) -> Iterable:
+    """
+    Start a streamed Groq completion, before any response is sent
+    
+    Raises:
+        HTTPException: 502 if Groq rejects or cannot take the request
+    """
+    try:
+        return await anyio.to_thread.run_sync(lambda: groq_client.chat.completions.create(
+            model=settings.GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=settings.ASK_MAX_TOKENS,
+            stream=True
+        ))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to answer the question: {str(e)}"
+        )
+
+
+def _stream_answer(stream: Iterable) -> Iterator[str]:
+    """Yield the answer from an open completion stream (blocking; iterated in a worker thread)"""
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    except Exception as e:
+        # The response has already started, so the error can only be logged
+        print(f"Error streaming answer: {e}")
+
+
+async def answer_question(question: str, user_id: str, meetings: List[dict]) -> StreamingResponse:
+    """
+    Answer a question from the most relevant passages of some meetings
+    
+    Args:
+        question: The user's question
+        user_id: Owner of the meetings
+        meetings: Meetings to search (id, title, meeting_date)
+    
+    Returns:
+        Plain-text response streaming the answer
+    
+    Raises:
+        HTTPException: 503 if the semantic index is disabled, 502 if the
+            completion cannot be started
+    """
+    if not settings.SEMANTIC_INDEX_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Questions need the semantic index, which is disabled"
+        )
+    
+    by_id = {meeting["id"]: meeting for meeting in meetings}
+    chunks = await semantic_search(user_id, question, settings.ASK_TOP_K, meeting_ids=by_id.keys())
+    
+    if not chunks:
+        # Nothing relevant: no point paying for a completion
+        answer = iter([NO_CONTEXT_ANSWER])
+    else:
+        # Opened here so Groq errors become a 502 instead of an empty 200;
+        # StreamingResponse iterates synchronous generators in a thread pool
+        stream = await _open_completion(build_prompt(question, chunks, by_id))
+        answer = _stream_answer(stream)
+    
+    return StreamingResponse(answer, media_type="text/plain; charset=utf-8")
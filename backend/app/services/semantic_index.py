@@ -0,0 +1,446 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import anyio
+import numpy as np
+
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writers are then only serialized per process
+    fcntl = None
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Extracted items indexed alongside transcript chunks: table -> (source, text column)
+ITEM_SOURCES = {
+    "decisions": ("decision", "decision_text"),
+    "action_items": ("action_item", "description"),
+    "follow_ups": ("follow_up", "description"),
+    "problem_statements": ("problem_statement", "statement"),
+}
+
+# Everything the index needs about a meeting, in one PostgREST request
+MEETING_CONTENT_SELECT = "id, user_id, transcripts(id, cleaned_transcript), " + ", ".join(
+    f"{table}(id, {column})" for table, (_, column) in ITEM_SOURCES.items()
+)
+
+
+def _features(text: str) -> List[str]:
+    """Words, word bigrams and character trigrams of a text"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    # Trigrams let inflections of a word ("price", "pricing") share features
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def term_counts(texts: Sequence[str], dim: int) -> np.ndarray:
+    """Hashed term counts of each text, as a (len(texts), dim) matrix"""
+    counts = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = [zlib.crc32(feature.encode()) % dim for feature in _features(text)]
+        if buckets:
+            counts[row] = np.bincount(buckets, minlength=dim)
+    return counts
+
+
+def chunk_transcript(text: str, words: int, overlap: int) -> List[str]:
+    """Split a transcript into windows of `words` words, overlapping by `overlap`"""
+    tokens = text.split()
+    step = max(words - overlap, 1)
+    chunks = []
+    for start in range(0, len(tokens), step):
+        chunks.append(" ".join(tokens[start:start + words]))
+        if start + words >= len(tokens):
+            break
+    return chunks
+
+
+@dataclass
+class _Segment:
+    """Vectors added together, with one metadata entry per row"""
+    name: str
+    vectors: np.ndarray  # (rows, dim) float32, memory-mapped
+    chunks: List[dict]
+    meeting_ids: np.ndarray
+    user_ids: np.ndarray
+    live: Optional[np.ndarray] = None  # Rows still current for their meeting (cached)
+
+
+class SemanticIndex:
+    """
+    Hashed TF-IDF vectors of meeting content, searched by cosine similarity
+
+    Each update is written as a new segment (vectors as .npy, chunk metadata
+    as JSON) and committed by atomically replacing manifest.json, which maps
+    every meeting to the segment holding its current chunks; older rows of
+    the meeting are ignored until segments are merged. Segments are loaded
+    memory-mapped, so a cold start reads no more than the pages searches
+    touch. Vectors are L2-normalized with the IDF weights at the time they
+    are added, so cosine similarity is a dot product.
+    """
+
+    def __init__(self, directory: str, dim: int, max_segments: int):
+        self.directory = directory
+        self.dim = dim
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._manifest_mtime: Optional[float] = None
+        self._segments: List[_Segment] = []
+        self._meetings: Dict[str, str] = {}
+        self._next_segment = 1
+        self._df = np.zeros(dim, dtype=np.float64)
+        self._docs = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize writers, across worker processes where possible"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self._path("index.lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """(Re)load the index if another process or a previous run changed it"""
+        try:
+            mtime = os.stat(self._path("manifest.json")).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+
+        with open(self._path("manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest["dim"] != self.dim:
+            raise RuntimeError(
+                f"Semantic index at {self.directory} has dimension {manifest['dim']}, "
+                f"not SEMANTIC_INDEX_DIM={self.dim}; rebuild it"
+            )
+
+        segments = []
+        for name in manifest["segments"]:
+            with open(self._path(f"{name}.json")) as f:
+                segments.append(self._load_segment(name, json.load(f)))
+
+        self._segments = segments
+        self._meetings = manifest["meetings"]
+        self._next_segment = manifest["next_segment"]
+        self._docs = manifest["docs"]
+        self._df = np.load(self._path("df.npy"))
+        self._manifest_mtime = mtime
+
+    def _idf(self) -> np.ndarray:
+        return (np.log((1 + self._docs) / (1 + self._df)) + 1).astype(np.float32)
+
+    def _vectors(self, counts: np.ndarray) -> np.ndarray:
+        """TF-IDF weight and L2-normalize hashed term counts"""
+        vectors = np.log1p(counts) * self._idf()
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _write_atomic(self, name: str, write) -> None:
+        temp_path = self._path(f"{name}.tmp")
+        with open(temp_path, "wb") as f:
+            write(f)
+        os.replace(temp_path, self._path(name))
+
+    def _commit(self, segments: List[_Segment]) -> None:
+        """Write the df vector and the manifest; the manifest makes the change visible"""
+        self._write_atomic("df.npy", lambda f: np.save(f, self._df))
+        manifest = {
+            "dim": self.dim,
+            "docs": self._docs,
+            "next_segment": self._next_segment,
+            "segments": [segment.name for segment in segments],
+            "meetings": self._meetings,
+        }
+        self._write_atomic("manifest.json", lambda f: f.write(json.dumps(manifest).encode()))
+        self._segments = segments
+        self._manifest_mtime = os.stat(self._path("manifest.json")).st_mtime_ns
+
+    def _write_segment(self, vectors: np.ndarray, chunks: List[dict]) -> _Segment:
+        name = f"segment-{self._next_segment:06d}"
+        self._next_segment += 1
+        self._write_atomic(f"{name}.npy", lambda f: np.save(f, vectors.astype(np.float32)))
+        self._write_atomic(f"{name}.json", lambda f: f.write(json.dumps(chunks).encode()))
+        return self._load_segment(name, chunks)
+
+    def _load_segment(self, name: str, chunks: List[dict]) -> _Segment:
+        return _Segment(
+            name=name,
+            vectors=np.load(self._path(f"{name}.npy"), mmap_mode="r"),
+            chunks=chunks,
+            meeting_ids=np.array([chunk["meeting_id"] for chunk in chunks], dtype=object),
+            user_ids=np.array([chunk["user_id"] for chunk in chunks], dtype=object)
+        )
+
+    def _live(self, segment: _Segment) -> np.ndarray:
+        if segment.live is None:
+            segment.live = np.fromiter(
+                (self._meetings.get(meeting_id) == segment.name for meeting_id in segment.meeting_ids),
+                dtype=bool,
+                count=len(segment.chunks)
+            )
+        return segment.live
+
+    def _forget(self, meeting_id: str) -> None:
+        """
+        Remove a meeting's indexed rows from the document frequencies
+
+        Stored vectors are non-zero exactly where a chunk has a term (IDF
+        weights are at least 1), so the rows' contributions are recovered
+        from them.
+        """
+        segment = next((s for s in self._segments if s.name == self._meetings.get(meeting_id)), None)
+        if segment is None:
+            return
+        rows = np.flatnonzero(segment.meeting_ids == meeting_id)
+        if len(rows):
+            self._df -= (np.asarray(segment.vectors[rows]) != 0).sum(axis=0)
+            self._docs -= len(rows)
+
+    def replace_meetings(self, contents: Dict[str, List[dict]]) -> None:
+        """
+        Make the given chunks the indexed content of each meeting
+
+        Earlier chunks of the meetings stop matching. Each chunk is a dict
+        with at least meeting_id, user_id and text; a meeting with no chunks
+        is removed from the index.
+        """
+        with self._write_lock():
+            segments = list(self._segments)
+            chunks = [chunk for items in contents.values() for chunk in items]
+
+            # Replaced content no longer counts towards IDF
+            for meeting_id in contents:
+                self._forget(meeting_id)
+
+            segment = None
+            if chunks:
+                counts = term_counts([chunk["text"] for chunk in chunks], self.dim)
+                self._df += (counts > 0).sum(axis=0)
+                self._docs += len(chunks)
+                segment = self._write_segment(self._vectors(counts), chunks)
+                segments.append(segment)
+
+            for meeting_id, items in contents.items():
+                if items:
+                    self._meetings[meeting_id] = segment.name
+                else:
+                    self._meetings.pop(meeting_id, None)
+            for existing in segments:
+                existing.live = None
+
+            merged = []
+            if len(segments) > self.max_segments:
+                merged, segments = segments, [self._merge(segments)]
+            self._commit(segments)
+
+            # Readers that still map merged files keep them until they reload (POSIX unlink semantics)
+            for old in merged:
+                for suffix in (".npy", ".json"):
+                    try:
+                        os.remove(self._path(old.name + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def replace_meeting(self, meeting_id: str, chunks: List[dict]) -> None:
+        """Make `chunks` the indexed content of one meeting (see replace_meetings)"""
+        self.replace_meetings({meeting_id: chunks})
+
+    def remove_meeting(self, meeting_id: str) -> None:
+        """Drop a meeting's chunks from search results"""
+        self.replace_meetings({meeting_id: []})
+
+    def _merge(self, segments: List[_Segment]) -> _Segment:
+        """Rewrite the live rows of all segments as one segment, recounting document frequencies from them"""
+        vectors, chunks = [], []
+        for segment in segments:
+            rows = np.flatnonzero(self._live(segment))
+            vectors.append(np.asarray(segment.vectors[rows]))
+            chunks.extend(segment.chunks[row] for row in rows)
+
+        vectors = np.concatenate(vectors)
+        self._df = (vectors != 0).sum(axis=0).astype(np.float64)
+        self._docs = len(chunks)
+
+        merged = self._write_segment(vectors, chunks)
+        self._meetings = {meeting_id: merged.name for meeting_id in self._meetings}
+        return merged
+
+    def search(
+        self,
+        queries: Sequence[str],
+        user_id: str,
+        k: int,
+        meeting_ids: Optional[Iterable[str]] = None
+    ) -> List[List[dict]]:
+        """
+        Top-k chunks of a user's meetings for each query, best first
+
+        All queries are scored against each segment with one matrix product.
+
+        Args:
+            queries: Query texts
+            user_id: Only this user's chunks are returned
+            k: Results per query
+            meeting_ids: Restrict results to these meetings
+
+        Returns:
+            For each query, up to k matching chunk dicts with an added score
+        """
+        with self._lock:
+            self._refresh()
+            query_vectors = self._vectors(term_counts(queries, self.dim))
+            allowed = set(meeting_ids) if meeting_ids is not None else None
+
+            candidates: List[List[tuple]] = [[] for _ in queries]
+            for segment in self._segments:
+                if not segment.chunks:
+                    continue
+                mask = self._live(segment) & (segment.user_ids == user_id)
+                if allowed is not None:
+                    mask &= np.fromiter((m in allowed for m in segment.meeting_ids), dtype=bool, count=len(segment.chunks))
+                if not mask.any():
+                    continue
+
+                scores = np.asarray(segment.vectors @ query_vectors.T)  # (rows, queries)
+                scores[~mask] = -np.inf
+                top = min(k, int(mask.sum()))
+                best = np.argpartition(-scores, top - 1, axis=0)[:top]
+                for q in range(len(queries)):
+                    # Chunks sharing no feature with the query score 0 and are left out
+                    candidates[q].extend(
+                        (float(scores[row, q]), segment, int(row)) for row in best[:, q] if scores[row, q] > 0
+                    )
+
+        results = []
+        for query_candidates in candidates:
+            query_candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            results.append([
+                {**segment.chunks[row], "score": score}
+                for score, segment, row in query_candidates[:k]
+            ])
+        return results
+
+
+_index: Optional[SemanticIndex] = None
+
+
+def get_semantic_index() -> SemanticIndex:
+    """Get the process-wide semantic index"""
+    global _index
+    if _index is None:
+        _index = SemanticIndex(
+            settings.SEMANTIC_INDEX_DIR, settings.SEMANTIC_INDEX_DIM, settings.SEMANTIC_INDEX_MAX_SEGMENTS
+        )
+    return _index
+
+
+def meeting_chunks(meeting: dict) -> List[dict]:
+    """Chunks of a meeting row fetched with MEETING_CONTENT_SELECT"""
+    base = {"meeting_id": meeting["id"], "user_id": meeting["user_id"]}
+    chunks = []
+
+    for transcript in meeting.get("transcripts") or []:
+        text = transcript.get("cleaned_transcript") or ""
+        windows = chunk_transcript(text, settings.SEMANTIC_CHUNK_WORDS, settings.SEMANTIC_CHUNK_OVERLAP)
+        for position, window in enumerate(windows):
+            chunks.append({**base, "source": "transcript", "source_id": transcript["id"], "position": position, "text": window})
+
+    for table, (source, column) in ITEM_SOURCES.items():
+        for item in meeting.get(table) or []:
+            if item.get(column):
+                chunks.append({**base, "source": source, "source_id": item["id"], "position": 0, "text": item[column]})
+
+    return chunks
+
+
+async def index_meeting(meeting_id: str) -> int:
+    """
+    (Re)index a meeting's transcript and extracted items
+
+    Returns:
+        Number of chunks indexed
+    """
+    supabase = get_supabase()
+    response = await execute(supabase.table("meetings").select(MEETING_CONTENT_SELECT).eq("id", meeting_id))
+    if not response.data:
+        await remove_meeting_from_index(meeting_id)
+        return 0
+
+    chunks = meeting_chunks(response.data[0])
+    # Embedding and file writes are blocking
+    await anyio.to_thread.run_sync(get_semantic_index().replace_meeting, meeting_id, chunks)
+    return len(chunks)
+
+
+async def remove_meeting_from_index(meeting_id: str) -> None:
+    """Drop a deleted meeting from the index"""
+    if settings.SEMANTIC_INDEX_ENABLED:
+        await anyio.to_thread.run_sync(get_semantic_index().remove_meeting, meeting_id)
+
+
+async def semantic_search(
+    user_id: str,
+    query: str,
+    k: int,
+    meeting_ids: Optional[Iterable[str]] = None
+) -> List[dict]:
+    """Top-k chunks of a user's meetings for one query (see SemanticIndex.search)"""
+    results = await anyio.to_thread.run_sync(
+        lambda: get_semantic_index().search([query], user_id, k, meeting_ids)
+    )
+    return results[0]
+
+
+async def rebuild_index(page_size: int = 100) -> None:
+    """Index every meeting, in pages ordered by ID"""
+    supabase = get_supabase()
+    offset = 0
+    indexed = 0
+
+    while True:
+        response = await execute(
+            supabase.table("meetings").select(MEETING_CONTENT_SELECT).order("id").range(offset, offset + page_size - 1)
+        )
+        # One segment per page
+        contents = {meeting["id"]: meeting_chunks(meeting) for meeting in response.data}
+        await anyio.to_thread.run_sync(get_semantic_index().replace_meetings, contents)
+        indexed += len(contents)
+
+        if len(response.data) < page_size:
+            break
+        offset += page_size
+
+    print(f"Indexed {indexed} meetings into {settings.SEMANTIC_INDEX_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the semantic index from the database")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(rebuild_index(page_size=args.page_size))
@@ -1,75 +1,340 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
 from fastapi import UploadFile, HTTPException
+import aiofiles
 from app.core.config import settings
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
+from app.services.storage_backends import STREAM_CHUNK_SIZE, get_storage_backend
+from app.services.transcoding import (
+    TRANSCODED_CONTENT_TYPE, TRANSCODED_EXTENSION, transcode_audio, transcoding_available
+)
+import hashlib
 import os
+import tempfile
 import uuid
 
 
 ALLOWED_EXTENSIONS = {".wav", ".mp3"}
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+AUDIO_PATH_COLUMNS = ("audio_file_path", "audio_original_path")
+AUDIO_CONTENT_TYPES = {".wav": "audio/wav", ".mp3": "audio/mpeg", TRANSCODED_EXTENSION: TRANSCODED_CONTENT_TYPE}
 
 
-async def upload_audio_file(file: UploadFile, meeting_id: str) -> tuple[str, str]:
+@dataclass
+class StoredAudio:
+    """Result of a successful audio upload"""
+    file_path: str
+    public_url: Optional[str]
+    size: int
+    sha256: Optional[str]  # Of the stored copy
+    original_size: Optional[int] = None  # Set when the stored copy was transcoded
+    original_path: Optional[str] = None  # Retained original, if any
+    original_expires_at: Optional[datetime] = None
+
+    @property
+    def compression_ratio(self) -> float:
+        """Uploaded size divided by stored size"""
+        return round((self.original_size or self.size) / self.size, 2) if self.size else 1.0
+
+    def meeting_fields(self) -> dict:
+        """Columns to set on the meeting row for this audio"""
+        return {
+            "audio_file_path": self.file_path,
+            "audio_file_url": self.public_url,
+            "audio_file_size": self.size,
+            "audio_file_sha256": self.sha256,
+            "audio_original_size": self.original_size or self.size,
+            "audio_compression_ratio": self.compression_ratio,
+            "audio_original_path": self.original_path,
+            "audio_original_expires_at": self.original_expires_at.isoformat() if self.original_expires_at else None
+        }
+
+
+def detect_audio_format(header: bytes) -> Optional[str]:
+    """
+    Identify an audio file from its leading bytes
+
+    Args:
+        header: First bytes of the file (at least 12)
+
+    Returns:
+        Matching extension from ALLOWED_EXTENSIONS, or None if unrecognised
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return ".wav"
+    # ID3v2 tag, or a bare MPEG audio frame sync (11 set bits)
+    if header[:3] == b"ID3" or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return ".mp3"
+    return None
+
+
+class AudioChunkReader:
+    """
+    Reads an audio file in chunks, validating as it goes
+
+    Works with any object exposing an async read(size) method, such as an
+    UploadFile or an aiofiles handle.
+
+    The file type is checked against the first chunk and the size limit is
+    enforced on every chunk, so oversized or mislabelled uploads are rejected
+    without reading the rest of the file. The SHA-256 digest and total size
+    are accumulated along the way.
     """
-    Upload audio file to Supabase Storage
+
+    def __init__(self, file, file_ext: str):
+        self.file = file
+        self.file_ext = file_ext
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            if self.size == 0 and detect_audio_format(chunk) != self.file_ext:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"File content is not a valid {self.file_ext} audio file"
+                )
+
+            self.size += len(chunk)
+            if self.size > MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024)}MB"
+                )
+
+            self.digest.update(chunk)
+            yield chunk
+
+        if self.size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+
+def new_audio_path(meeting_id: str, file_ext: str) -> str:
+    """Generate a unique storage path for a meeting's audio"""
+    return f"meetings/{meeting_id}_{uuid.uuid4()}{file_ext}"
+
+
+def is_meeting_audio_path(file_path: str, meeting_id: str) -> bool:
+    """Whether a storage path was generated for the given meeting"""
+    return file_path.startswith(f"meetings/{meeting_id}_") and "/" not in file_path[len("meetings/"):]
+
+
+async def upload_audio_file(file: UploadFile, meeting_id: str) -> StoredAudio:
+    """
+    Upload audio file to the storage backend
+    
+    The file is streamed in chunks: it is never held in memory as a whole,
+    and the upload is aborted as soon as it exceeds MAX_FILE_SIZE.
     
     Args:
         file: Uploaded audio file
         meeting_id: Meeting ID for organizing files
         
     Returns:
-        Tuple of (file_path, public_url)
+        StoredAudio with the storage path, public URL, size and SHA-256
         
     Raises:
         HTTPException: If file validation fails or upload fails
     """
-    # Validate file extension
-    file_ext = os.path.splitext(file.filename)[1].lower()
+    file_ext = validate_audio_extension(file.filename)
+    return await store_audio_stream(file, file_ext, meeting_id)
+
+
+def validate_audio_extension(filename: Optional[str]) -> str:
+    """
+    Return the lower-cased extension of an audio filename
+
+    Raises:
+        HTTPException: If the extension is not in ALLOWED_EXTENSIONS
+    """
+    file_ext = os.path.splitext(filename or "")[1].lower()
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
         )
+    return file_ext
+
+
+async def store_audio_stream(file, file_ext: str, meeting_id: str) -> StoredAudio:
+    """
+    Validate and stream an open audio file to storage under a new unique path
+
+    When transcoding is available the upload is re-encoded to a compact
+    speech codec and only that copy is kept (plus the original, if
+    AUDIO_ORIGINAL_RETENTION_DAYS is set).
+
+    Args:
+        file: Object with an async read(size) method, positioned at the start
+        file_ext: Validated extension of the file
+        meeting_id: Meeting ID for organizing files
+
+    Returns:
+        StoredAudio with the storage path, public URL, size and SHA-256
+    """
+    reader = AudioChunkReader(file, file_ext)
     
-    # Generate unique filename
-    unique_filename = f"{meeting_id}_{uuid.uuid4()}{file_ext}"
-    file_path = f"meetings/{unique_filename}"
-    
-    # Read file content
-    content = await file.read()
-    
-    # Validate file size
-    if len(content) > MAX_FILE_SIZE:
+    try:
+        if transcoding_available():
+            return await _store_transcoded(reader, file_ext, meeting_id)
+        
+        backend = get_storage_backend()
+        file_path = new_audio_path(meeting_id, file_ext)
+        await backend.put(file_path, reader, AUDIO_CONTENT_TYPES[file_ext])
+    except HTTPException:
+        raise
+    except Exception as e:
         raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024)}MB"
+            status_code=500,
+            detail=f"Failed to upload file: {str(e)}"
         )
     
-    try:
-        supabase = get_supabase()
+    return StoredAudio(
+        file_path=file_path,
+        public_url=backend.public_url(file_path),
+        size=reader.size,
+        sha256=reader.digest.hexdigest()
+    )
+
+
+async def _read_local_file(path: str, digest=None) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(STREAM_CHUNK_SIZE):
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+
+
+async def _store_transcoded(reader: AudioChunkReader, file_ext: str, meeting_id: str) -> StoredAudio:
+    """Spool an upload to disk, transcode it and store the compact copy"""
+    backend = get_storage_backend()
+    
+    with tempfile.TemporaryDirectory(prefix="audio-ingest-") as work_dir:
+        source_path = os.path.join(work_dir, f"source{file_ext}")
+        async with aiofiles.open(source_path, "wb") as source:
+            async for chunk in reader:
+                await source.write(chunk)
         
-        # Upload to Supabase Storage
-        response = supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).upload(
-            file_path,
-            content,
-            file_options={"content-type": file.content_type or "audio/mpeg"}
-        )
+        target_path = os.path.join(work_dir, f"compact{TRANSCODED_EXTENSION}")
+        try:
+            await transcode_audio(source_path, target_path)
+            compact_size = os.path.getsize(target_path)
+        except Exception as e:
+            print(f"Transcoding failed, storing original audio: {e}")
+            compact_size = None
         
-        # Get public URL
-        public_url = supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).get_public_url(file_path)
+        if compact_size is None or compact_size >= reader.size:
+            # Already compact (or not decodable by ffmpeg): keep the upload as is
+            file_path = new_audio_path(meeting_id, file_ext)
+            await backend.put(file_path, _read_local_file(source_path), AUDIO_CONTENT_TYPES[file_ext])
+            return StoredAudio(
+                file_path=file_path,
+                public_url=backend.public_url(file_path),
+                size=reader.size,
+                sha256=reader.digest.hexdigest()
+            )
         
-        return file_path, public_url
+        # audio_file_sha256 describes the stored object, like audio_file_size
+        compact_digest = hashlib.sha256()
+        file_path = new_audio_path(meeting_id, TRANSCODED_EXTENSION)
+        await backend.put(file_path, _read_local_file(target_path, compact_digest), TRANSCODED_CONTENT_TYPE)
         
+        original_path = None
+        original_expires_at = None
+        if settings.AUDIO_ORIGINAL_RETENTION_DAYS > 0:
+            original_path = f"originals/{meeting_id}_{uuid.uuid4()}{file_ext}"
+            await backend.put(original_path, _read_local_file(source_path), AUDIO_CONTENT_TYPES[file_ext])
+            original_expires_at = datetime.now(timezone.utc) + timedelta(days=settings.AUDIO_ORIGINAL_RETENTION_DAYS)
+    
+    return StoredAudio(
+        file_path=file_path,
+        public_url=backend.public_url(file_path),
+        size=compact_size,
+        sha256=compact_digest.hexdigest(),
+        original_size=reader.size,
+        original_path=original_path,
+        original_expires_at=original_expires_at
+    )
+
+
+async def create_signed_audio_upload(meeting_id: str, filename: str) -> dict:
+    """
+    Create a signed URL the client can upload audio to directly
+
+    The upload goes straight to the storage backend; the URL is only valid
+    for the returned path and expires after a short time (set by Supabase).
+
+    Args:
+        meeting_id: Meeting ID for organizing files
+        filename: Original filename, used to determine the audio type
+
+    Returns:
+        Dict with signed_url, token and file_path
+    """
+    file_ext = validate_audio_extension(filename)
+    file_path = new_audio_path(meeting_id, file_ext)
+    
+    try:
+        signed = await get_storage_backend().create_signed_upload(file_path)
+    except NotImplementedError as e:
+        raise HTTPException(
+            status_code=501,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to upload file: {str(e)}"
+            detail=f"Failed to create upload URL: {str(e)}"
         )
+    
+    return {
+        "signed_url": signed["signed_url"],
+        "token": signed["token"],
+        "file_path": file_path
+    }
+
+
+async def verify_uploaded_audio(file_path: str) -> StoredAudio:
+    """
+    Check an object uploaded directly by a client before using it
+
+    The object must exist, be within MAX_FILE_SIZE and start with the magic
+    bytes of its extension. Invalid objects are deleted.
+
+    Raises:
+        HTTPException: If the object is missing or invalid
+    """
+    file_ext = validate_audio_extension(file_path)
+    
+    backend = get_storage_backend()
+    stat = await backend.stat(file_path)
+    if stat is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Uploaded file not found in storage"
+        )
+    
+    header = await backend.read_range(file_path, 0, 11) if stat.size else b""
+    if stat.size > MAX_FILE_SIZE or detect_audio_format(header) != file_ext:
+        await delete_audio_file(file_path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Uploaded file is not a valid {file_ext} audio file within {MAX_FILE_SIZE / (1024*1024)}MB"
+        )
+    
+    # The bytes never passed through the API, so no digest is available
+    return StoredAudio(file_path=file_path, public_url=backend.public_url(file_path), size=stat.size, sha256=None)
 
 
 async def delete_audio_file(file_path: str) -> bool:
     """
-    Delete audio file from Supabase Storage
+    Delete audio file from the storage backend
     
     Args:
         file_path: Path to file in storage
@@ -78,8 +343,57 @@ async def delete_audio_file(file_path: str) -> bool:
         True if successful
     """
     try:
-        supabase = get_supabase()
-        supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).remove([file_path])
+        await get_storage_backend().delete([file_path])
         return True
     except Exception:
         return False
+
+
+async def delete_meeting_audio(meeting: dict) -> bool:
+    """
+    Delete the audio objects a meeting row points to
+
+    Call after the meeting is deleted or its audio replaced. Failures are
+    left to the orphaned-audio collector.
+
+    Args:
+        meeting: Meeting row as it was before the change
+
+    Returns:
+        True if successful
+    """
+    paths = [meeting[column] for column in AUDIO_PATH_COLUMNS if meeting.get(column)]
+    if not paths:
+        return True
+    
+    try:
+        await get_storage_backend().delete(paths)
+        return True
+    except Exception as e:
+        print(f"Failed to delete audio {paths}: {e}")
+        return False
+
+
+async def purge_expired_originals(batch_size: int = 100) -> int:
+    """
+    Delete retained original uploads whose retention window has passed
+
+    Returns:
+        Number of originals deleted
+    """
+    supabase = get_supabase()
+    now = datetime.now(timezone.utc).isoformat()
+    
+    response = await execute(supabase.table("meetings").select("id, audio_original_path").lt("audio_original_expires_at", now).limit(batch_size))
+    expired = [m for m in response.data if m.get("audio_original_path")]
+    
+    if expired:
+        await get_storage_backend().delete([m["audio_original_path"] for m in expired])
+    
+    if response.data:
+        await execute(supabase.table("meetings").update({
+            "audio_original_path": None,
+            "audio_original_expires_at": None
+        }).in_("id", [m["id"] for m in response.data]))
+    
+    return len(expired)
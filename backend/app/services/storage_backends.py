@@ -0,0 +1,305 @@
+import mimetypes
+import mmap
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterable, AsyncIterator, BinaryIO, List, Optional, Tuple
+import aiofiles
+import aiofiles.os
+import anyio
+import httpx
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import get_supabase
+
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+@dataclass
+class ObjectStat:
+    """Metadata of a stored object"""
+    size: int
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[datetime]
+
+
+@dataclass
+class ObjectInfo:
+    """Entry of an object listing"""
+    path: str
+    size: int
+    created_at: Optional[datetime]
+
+
+class StorageBackend(ABC):
+    """Object storage used for meeting audio"""
+
+    @abstractmethod
+    async def put(self, path: str, chunks: AsyncIterable[bytes], content_type: str) -> None:
+        """Store an object from a stream of chunks without buffering it"""
+
+    @abstractmethod
+    def get_stream(self, path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Stream a whole object in chunks"""
+
+    @abstractmethod
+    def iter_range(self, path: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Stream bytes start..end (inclusive) of an object in chunks"""
+
+    async def read_range(self, path: str, start: int, end: int) -> bytes:
+        """Read bytes start..end (inclusive) of an object"""
+        return b"".join([chunk async for chunk in self.iter_range(path, start, end)])
+
+    @abstractmethod
+    async def delete(self, paths: List[str]) -> None:
+        """Delete objects. Missing objects are ignored."""
+
+    @abstractmethod
+    async def stat(self, path: str) -> Optional[ObjectStat]:
+        """Get object metadata, or None if it does not exist"""
+
+    @abstractmethod
+    async def list_objects(self, prefix: str, limit: int, offset: int = 0) -> List[ObjectInfo]:
+        """List one page of the objects directly under a folder, sorted by name"""
+
+    @abstractmethod
+    def public_url(self, path: str) -> Optional[str]:
+        """Public URL of an object, if the backend serves one"""
+
+    def local_path(self, path: str) -> Optional[str]:
+        """Filesystem path of an object, if it is stored on local disk"""
+        return None
+
+    async def create_signed_upload(self, path: str) -> dict:
+        """
+        Create a URL clients can upload an object to directly
+
+        Returns:
+            Dict with signed_url and token
+
+        Raises:
+            NotImplementedError: If the backend has no direct upload support
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support signed uploads")
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """Supabase Storage bucket, accessed through its REST API"""
+
+    def __init__(self, url: str, key: str, bucket: str):
+        self.base_url = f"{url}/storage/v1/object"
+        self.key = key
+        self.bucket = bucket
+
+    @property
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.key}",
+            "apikey": self.key
+        }
+
+    def _object_url(self, path: str) -> str:
+        return f"{self.base_url}/{self.bucket}/{path}"
+
+    async def put(self, path: str, chunks: AsyncIterable[bytes], content_type: str) -> None:
+        headers = {**self._headers, "Content-Type": content_type, "x-upsert": "false"}
+        async with httpx.AsyncClient(timeout=300.0) as client:
+            response = await client.post(self._object_url(path), content=chunks, headers=headers)
+            response.raise_for_status()
+
+    async def _stream(self, path: str, headers: dict, chunk_size: int) -> AsyncIterator[bytes]:
+        async with httpx.AsyncClient(timeout=300.0) as client:
+            async with client.stream("GET", self._object_url(path), headers=headers) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+
+    def get_stream(self, path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        return self._stream(path, self._headers, chunk_size)
+
+    def iter_range(self, path: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        headers = {**self._headers, "Range": f"bytes={start}-{end}"}
+        return self._stream(path, headers, chunk_size)
+
+    async def delete(self, paths: List[str]) -> None:
+        supabase = get_supabase()
+        await run_in_threadpool(supabase.storage.from_(self.bucket).remove, paths)
+
+    async def stat(self, path: str) -> Optional[ObjectStat]:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.head(self._object_url(path), headers=self._headers)
+
+        if response.status_code in (400, 404):
+            return None
+        response.raise_for_status()
+
+        last_modified = response.headers.get("last-modified")
+        return ObjectStat(
+            size=int(response.headers.get("content-length", 0)),
+            content_type=response.headers.get("content-type"),
+            etag=response.headers.get("etag"),
+            last_modified=parsedate_to_datetime(last_modified) if last_modified else None
+        )
+
+    async def list_objects(self, prefix: str, limit: int, offset: int = 0) -> List[ObjectInfo]:
+        supabase = get_supabase()
+        entries = await run_in_threadpool(
+            supabase.storage.from_(self.bucket).list,
+            prefix,
+            {"limit": limit, "offset": offset, "sortBy": {"column": "name", "order": "asc"}}
+        )
+
+        objects = []
+        for entry in entries:
+            if entry.get("id") is None:
+                continue  # Sub-folder
+            created_at = entry.get("created_at")
+            objects.append(ObjectInfo(
+                path=f"{prefix}/{entry['name']}",
+                size=(entry.get("metadata") or {}).get("size", 0),
+                created_at=datetime.fromisoformat(created_at.replace("Z", "+00:00")) if created_at else None
+            ))
+        return objects
+
+    def public_url(self, path: str) -> Optional[str]:
+        supabase = get_supabase()
+        return supabase.storage.from_(self.bucket).get_public_url(path)
+
+    async def create_signed_upload(self, path: str) -> dict:
+        supabase = get_supabase()
+        signed = await run_in_threadpool(supabase.storage.from_(self.bucket).create_signed_upload_url, path)
+        return {"signed_url": signed["signed_url"], "token": signed["token"]}
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Objects stored as files under a root directory
+
+    Range reads use memory-mapped files, mapped and read in worker threads,
+    and local_path() lets callers hand files to the server (FileResponse) or
+    to tools without copying them.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def local_path(self, path: str) -> str:
+        full_path = os.path.abspath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, full_path]) != self.root:
+            raise ValueError(f"Path escapes storage root: {path}")
+        return full_path
+
+    async def put(self, path: str, chunks: AsyncIterable[bytes], content_type: str) -> None:
+        full_path = self.local_path(path)
+        if os.path.exists(full_path):
+            raise FileExistsError(f"Object already exists: {path}")
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        # Write to a temporary name so readers never see a partial object
+        temp_path = f"{full_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    async def get_stream(self, path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.local_path(path), "rb") as f:
+            while chunk := await f.read(chunk_size):
+                yield chunk
+
+    def _map(self, path: str) -> Tuple[BinaryIO, Optional[mmap.mmap]]:
+        f = open(self.local_path(path), "rb")
+        try:
+            if os.fstat(f.fileno()).st_size == 0:
+                return f, None
+            return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            f.close()
+            raise
+
+    async def iter_range(self, path: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        # Opening, mapping and faulting pages in can block on disk, so it runs in worker threads
+        f, mapped = await anyio.to_thread.run_sync(self._map, path)
+        try:
+            if mapped is None:
+                return
+            end = min(end, len(mapped) - 1)
+            position = start
+            while position <= end:
+                next_position = min(position + chunk_size, end + 1)
+                # Slicing the mapping copies straight from the page cache
+                yield await anyio.to_thread.run_sync(mapped.__getitem__, slice(position, next_position))
+                position = next_position
+        finally:
+            if mapped is not None:
+                mapped.close()
+            f.close()
+
+    async def delete(self, paths: List[str]) -> None:
+        for path in paths:
+            try:
+                await aiofiles.os.remove(self.local_path(path))
+            except FileNotFoundError:
+                pass
+
+    async def stat(self, path: str) -> Optional[ObjectStat]:
+        try:
+            result = await aiofiles.os.stat(self.local_path(path))
+        except FileNotFoundError:
+            return None
+
+        return ObjectStat(
+            size=result.st_size,
+            content_type=mimetypes.guess_type(path)[0],
+            etag=f'"{result.st_size:x}-{result.st_mtime_ns:x}"',
+            last_modified=datetime.fromtimestamp(result.st_mtime, tz=timezone.utc)
+        )
+
+    def _list_folder(self, prefix: str, limit: int, offset: int) -> List[ObjectInfo]:
+        folder = self.local_path(prefix)
+        try:
+            names = sorted(entry.name for entry in os.scandir(folder) if entry.is_file())
+        except FileNotFoundError:
+            return []
+
+        objects = []
+        for name in names[offset:offset + limit]:
+            result = os.stat(os.path.join(folder, name))
+            objects.append(ObjectInfo(
+                path=f"{prefix}/{name}",
+                size=result.st_size,
+                created_at=datetime.fromtimestamp(result.st_mtime, tz=timezone.utc)
+            ))
+        return objects
+
+    async def list_objects(self, prefix: str, limit: int, offset: int = 0) -> List[ObjectInfo]:
+        # Scanning and stat-ing a large folder blocks on disk, so it runs in a worker thread
+        return await anyio.to_thread.run_sync(self._list_folder, prefix, limit, offset)
+
+    def public_url(self, path: str) -> Optional[str]:
+        return None
+
+
+def _create_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "supabase":
+        return SupabaseStorageBackend(settings.SUPABASE_URL, settings.SUPABASE_KEY, settings.SUPABASE_STORAGE_BUCKET)
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.LOCAL_STORAGE_DIR)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+storage_backend: StorageBackend = _create_backend()
+
+
+def get_storage_backend() -> StorageBackend:
+    """Get the configured storage backend"""
+    return storage_backend
@@ -0,0 +1,65 @@
+import asyncio
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from app.core.config import settings
+
+TRANSCODED_EXTENSION = ".ogg"
+TRANSCODED_CONTENT_TYPE = "audio/ogg"
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def transcoding_available() -> bool:
+    """Whether ingest-time transcoding is enabled and ffmpeg is installed"""
+    return settings.AUDIO_TRANSCODE_ENABLED and shutil.which(settings.FFMPEG_PATH) is not None
+
+
+def _transcode(ffmpeg_path: str, source_path: str, target_path: str, bitrate: str) -> None:
+    """Run ffmpeg to encode speech as mono 16kHz Opus. Executed in a worker process."""
+    subprocess.run(
+        [
+            ffmpeg_path, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+            "-i", source_path,
+            "-vn", "-ac", "1", "-ar", "16000",
+            "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+            target_path
+        ],
+        check=True,
+        capture_output=True,
+        timeout=settings.AUDIO_TRANSCODE_TIMEOUT_SECONDS
+    )
+
+
+async def transcode_audio(source_path: str, target_path: str) -> None:
+    """
+    Transcode an audio file to the compact archival codec (Opus in Ogg)
+
+    The work runs in a process pool so the event loop is never blocked and
+    the number of concurrent encodes is bounded by AUDIO_TRANSCODE_WORKERS.
+
+    Args:
+        source_path: Local path of the uploaded audio
+        target_path: Local path to write the transcoded audio to
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.AUDIO_TRANSCODE_WORKERS)
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        _executor, _transcode,
+        settings.FFMPEG_PATH, source_path, target_path, settings.AUDIO_TRANSCODE_BITRATE
+    )
+
+
+def shutdown_transcoder() -> None:
+    """Stop the worker processes"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,9 +1,10 @@
-import base64
+import mimetypes
 import os
 import tempfile
 import httpx
-from app.core.database import get_supabase
+from app.core.database import execute, get_supabase
 from app.core.config import settings
+from app.services.storage_backends import get_storage_backend
 
 
 async def transcribe_audio(meeting_id: str, audio_file_path: str) -> str:
@@ -12,7 +13,7 @@ async def transcribe_audio(meeting_id: str, audio_file_path: str) -> str:
     
     Args:
         meeting_id: Meeting ID
-        audio_file_path: Path to audio file in Supabase Storage
+        audio_file_path: Path to audio file in the storage backend
         
     Returns:
         Transcript ID
@@ -24,51 +25,54 @@ async def transcribe_audio(meeting_id: str, audio_file_path: str) -> str:
         "meeting_id": meeting_id,
         "transcription_status": "processing"
     }
-    transcript_response = supabase.table("transcripts").insert(transcript_data).execute()
+    transcript_response = await execute(supabase.table("transcripts").insert(transcript_data))
     transcript_id = transcript_response.data[0]["id"]
     
     try:
-        # Download audio file from Supabase Storage
-        public_url = supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).get_public_url(audio_file_path)
+        backend = get_storage_backend()
+        local_path = backend.local_path(audio_file_path)
         
-        # Download file to temp location
-        async with httpx.AsyncClient() as client:
-            response = await client.get(public_url)
-            response.raise_for_status()
-            
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file_path)[1]) as temp_file:
-                temp_file.write(response.content)
-                temp_file_path = temp_file.name
-        
-        # Transcribe using Groq's Whisper API
-        transcript = await transcribe_with_groq(temp_file_path)
-        
-        # Clean up temp file
-        os.unlink(temp_file_path)
+        if local_path:
+            # Stored on this machine: read it in place, no download
+            transcript = await transcribe_with_groq(local_path)
+        else:
+            transcript = await _transcribe_remote(backend, audio_file_path)
         
         # Basic cleaning
         cleaned_transcript = transcript.strip()
         
         # Update transcript record
-        supabase.table("transcripts").update({
+        await execute(supabase.table("transcripts").update({
             "raw_transcript": transcript,
             "cleaned_transcript": cleaned_transcript,
             "transcription_status": "completed"
-        }).eq("id", transcript_id).execute()
+        }).eq("id", transcript_id))
         
         return transcript_id
         
     except Exception as e:
         # Update transcript with error
-        supabase.table("transcripts").update({
+        await execute(supabase.table("transcripts").update({
             "transcription_status": "failed",
             "error_message": str(e)
-        }).eq("id", transcript_id).execute()
+        }).eq("id", transcript_id))
         
         raise Exception(f"Transcription failed: {str(e)}")
 
 
+async def _transcribe_remote(backend, audio_file_path: str) -> str:
+    """Stream a remote audio file to a temporary file and transcribe it"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file_path)[1])
+    try:
+        with temp_file:
+            async for chunk in backend.get_stream(audio_file_path):
+                temp_file.write(chunk)
+        
+        return await transcribe_with_groq(temp_file.name)
+    finally:
+        os.unlink(temp_file.name)
+
+
 async def transcribe_with_groq(audio_file_path: str) -> str:
     """
     Transcribe audio using Groq's Whisper API
@@ -82,34 +86,35 @@ async def transcribe_with_groq(audio_file_path: str) -> str:
     if not settings.GROQ_API_KEY:
         raise ValueError("GROQ_API_KEY is not configured")
     
-    # Read and encode audio file
-    with open(audio_file_path, "rb") as audio_file:
-        audio_data = audio_file.read()
-    
     # Prepare the request to Groq
     headers = {
         "Authorization": f"Bearer {settings.GROQ_API_KEY}",
     }
     
-    # Use multipart form data for file upload
-    files = {
-        "file": (os.path.basename(audio_file_path), audio_data, "audio/mpeg")
-    }
-    
     data = {
         "model": "whisper-large-v3",  # Groq's Whisper model
         "response_format": "json",
         "language": "en"  # Optional: specify language
     }
     
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        response = await client.post(
-            "https://api.groq.com/openai/v1/audio/transcriptions",
-            headers=headers,
-            files=files,
-            data=data
-        )
-        response.raise_for_status()
+    # Use multipart form data for file upload; the file is streamed from disk
+    with open(audio_file_path, "rb") as audio_file:
+        files = {
+            "file": (
+                os.path.basename(audio_file_path),
+                audio_file,
+                mimetypes.guess_type(audio_file_path)[0] or "audio/mpeg"
+            )
+        }
         
-        result = response.json()
-        return result.get("text", "")
+        async with httpx.AsyncClient(timeout=300.0) as client:
+            response = await client.post(
+                "https://api.groq.com/openai/v1/audio/transcriptions",
+                headers=headers,
+                files=files,
+                data=data
+            )
+            response.raise_for_status()
+    
+    result = response.json()
+    return result.get("text", "")
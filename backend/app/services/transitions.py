@@ -0,0 +1,173 @@
+import uuid
+from typing import Dict, List, Tuple
+from fastapi import HTTPException, status
+from app.core.audit import audit_record, audit_writer
+from app.core.database import execute, get_supabase
+from app.models.meeting import ActionStatus, ActionTransition, BulkOutcome, FollowUpStatus
+
+# Allowed transitions: target state -> states it can be reached from.
+# Only approval is restricted (to pending items); reject and complete work
+# from any state, as they always have.
+ACTION_TRANSITIONS: Dict[ActionStatus, Tuple[ActionStatus, ...]] = {
+    ActionStatus.APPROVED: (ActionStatus.PENDING,),
+    ActionStatus.REJECTED: tuple(ActionStatus),
+    ActionStatus.COMPLETED: tuple(ActionStatus),
+}
+
+# Target state of each review transition
+TRANSITION_TARGETS: Dict[ActionTransition, ActionStatus] = {
+    ActionTransition.APPROVE: ActionStatus.APPROVED,
+    ActionTransition.REJECT: ActionStatus.REJECTED,
+    ActionTransition.COMPLETE: ActionStatus.COMPLETED,
+}
+
+FOLLOW_UP_TRANSITIONS: Dict[FollowUpStatus, Tuple[FollowUpStatus, ...]] = {
+    FollowUpStatus.COMPLETED: tuple(FollowUpStatus),
+}
+
+
+async def transition_action_items(ids: List[str], user_id: str, target: ActionStatus) -> List[dict]:
+    """
+    Move action items to a new state in one round trip
+    
+    Only items of the user's meetings that are currently in a state allowed
+    by ACTION_TRANSITIONS are changed. Their audit_log rows are written in
+    the same statement, or queued on the audit writer in buffered mode while
+    it has room.
+    
+    Returns:
+        The updated rows (items that did not qualify are left out)
+    """
+    supabase = get_supabase()
+    async with audit_writer.slots(len(ids)) as buffered:
+        response = await execute(supabase.rpc("transition_action_items", {
+            "p_ids": ids,
+            "p_user_id": user_id,
+            "p_from_states": [state.value for state in ACTION_TRANSITIONS[target]],
+            "p_to_state": target.value,
+            "p_write_audit": not buffered
+        }))
+        
+        if buffered and response.data:
+            await audit_writer.record([
+                audit_record(user_id, "action_item", row["action_item"]["id"], target.value, row["previous_status"], target.value)
+                for row in response.data
+            ])
+    
+    return [row["action_item"] for row in response.data]
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+async def review_action_items(entries: List[Tuple[str, ActionTransition]], user_id: str) -> List[dict]:
+    """
+    Apply a review transition to each of several action items in one round trip
+    
+    Ownership and current states are read with one query and the qualifying
+    items are updated with one statement, inside the review_action_items SQL
+    function. Audit rows are written with one insert in that statement, or
+    queued on the audit writer in buffered mode while it has room.
+    
+    Args:
+        entries: (action item ID, transition) pairs, with unique IDs
+        user_id: User whose meetings the items must belong to
+    
+    Returns:
+        One result per entry, in order, with id, outcome, previous_status
+        and the updated row as action_item (None unless updated)
+    """
+    # IDs that are not UUIDs cannot exist and would fail the whole statement
+    valid = [(entity_id, transition) for entity_id, transition in entries if _is_uuid(entity_id)]
+    
+    rows = {}
+    if valid:
+        supabase = get_supabase()
+        async with audit_writer.slots(len(valid)) as buffered:
+            response = await execute(supabase.rpc("review_action_items", {
+                "p_user_id": user_id,
+                "p_ids": [entity_id for entity_id, _ in valid],
+                "p_to_states": [TRANSITION_TARGETS[transition].value for _, transition in valid],
+                "p_allowed": {
+                    target.value: [state.value for state in sources]
+                    for target, sources in ACTION_TRANSITIONS.items()
+                },
+                "p_write_audit": not buffered
+            }))
+            
+            updated = [row for row in response.data if row["outcome"] == BulkOutcome.UPDATED.value]
+            if buffered and updated:
+                await audit_writer.record([
+                    audit_record(
+                        user_id, "action_item", row["action_item_id"], row["action_item"]["status"],
+                        row["previous_status"], row["action_item"]["status"]
+                    )
+                    for row in updated
+                ])
+        rows = {str(uuid.UUID(row["action_item_id"])): row for row in response.data}
+    
+    results = []
+    for entity_id, transition in entries:
+        row = rows.get(str(uuid.UUID(entity_id))) if _is_uuid(entity_id) else None
+        results.append({
+            "id": entity_id,
+            "transition": transition,
+            "outcome": row["outcome"] if row else BulkOutcome.NOT_FOUND.value,
+            "previous_status": row["previous_status"] if row else None,
+            "action_item": row["action_item"] if row else None
+        })
+    return results
+
+
+async def transition_follow_ups(ids: List[str], user_id: str, target: FollowUpStatus) -> List[dict]:
+    """Move follow-ups to a new state in one round trip (see transition_action_items)"""
+    supabase = get_supabase()
+    async with audit_writer.slots(len(ids)) as buffered:
+        response = await execute(supabase.rpc("transition_follow_ups", {
+            "p_ids": ids,
+            "p_user_id": user_id,
+            "p_from_states": [state.value for state in FOLLOW_UP_TRANSITIONS[target]],
+            "p_to_state": target.value,
+            "p_write_audit": not buffered
+        }))
+        
+        if buffered and response.data:
+            await audit_writer.record([
+                audit_record(user_id, "follow_up", row["follow_up"]["id"], target.value.upper(), row["previous_status"], target.value)
+                for row in response.data
+            ])
+    
+    return [row["follow_up"] for row in response.data]
+
+
+async def raise_transition_error(table: str, entity_id: str, user_id: str, target: str, label: str):
+    """
+    Explain why a single-row transition changed nothing
+
+    Only called after a failed transition, so successful requests stay at
+    one round trip.
+
+    Raises:
+        HTTPException: 404 if the user has no such row, 400 if its current
+            state does not allow the transition
+    """
+    supabase = get_supabase()
+    response = await execute(
+        supabase.table(table).select("status, meetings!inner(user_id)").eq("id", entity_id).eq("meetings.user_id", user_id)
+    )
+
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{label} not found"
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"{label} cannot move from {response.data[0]['status']} to {target}"
+    )
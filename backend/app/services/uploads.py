@@ -0,0 +1,260 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, Tuple
+import aiofiles
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+from app.services.storage import (
+    MAX_FILE_SIZE, StoredAudio, detect_audio_format, store_audio_stream, validate_audio_extension
+)
+
+# Session states: uploading (idle), receiving (a request is writing a chunk),
+# completing (the last chunk arrived and one request is storing the file),
+# completed
+SESSION_UPLOADING = "uploading"
+SESSION_RECEIVING = "receiving"
+SESSION_COMPLETING = "completing"
+SESSION_COMPLETED = "completed"
+
+
+def _staging_path(upload_id: str) -> str:
+    return os.path.join(settings.UPLOAD_STAGING_DIR, f"{upload_id}.part")
+
+
+async def create_upload_session(meeting_id: str, user_id: str, filename: str, size: int) -> dict:
+    """
+    Start a resumable upload for a meeting's audio
+
+    Args:
+        meeting_id: Meeting the audio belongs to
+        user_id: Owner of the meeting
+        filename: Original filename, used to determine the audio type
+        size: Total size of the file in bytes
+
+    Returns:
+        The upload session row
+
+    Raises:
+        HTTPException: If the file type or size is not allowed
+    """
+    validate_audio_extension(filename)
+    if size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024*1024)}MB"
+        )
+
+    supabase = get_supabase()
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    response = await execute(supabase.table("upload_sessions").insert({
+        "meeting_id": meeting_id,
+        "user_id": user_id,
+        "filename": filename,
+        "size": size,
+        "expires_at": expires_at.isoformat()
+    }))
+
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    # Create the empty staging file so the offset is known from the start
+    open(_staging_path(response.data[0]["id"]), "wb").close()
+
+    return response.data[0]
+
+
+async def get_upload_session(upload_id: str, meeting_id: str, user_id: str) -> dict:
+    """
+    Fetch an upload session owned by the user
+
+    Raises:
+        HTTPException: If the session does not exist or has expired
+    """
+    supabase = get_supabase()
+    response = await execute(supabase.table("upload_sessions").select("*").eq("id", upload_id).eq("meeting_id", meeting_id).eq("user_id", user_id))
+
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+
+    session = response.data[0]
+    expired = datetime.fromisoformat(session["expires_at"]) <= datetime.now(timezone.utc)
+    if expired and session["status"] != SESSION_COMPLETED:
+        discard_staged_upload(upload_id)
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Upload session has expired"
+        )
+
+    return session
+
+
+def discard_staged_upload(upload_id: str) -> None:
+    """Remove the staging file of an upload, if any"""
+    try:
+        os.unlink(_staging_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lock_expiry() -> str:
+    return (_now() + timedelta(seconds=settings.UPLOAD_LOCK_SECONDS)).isoformat()
+
+
+async def _claim(upload_id: str, offset: int, locked_until: str) -> Optional[dict]:
+    """
+    Claim the right to write at `offset`, across all workers
+
+    A conditional update: it only matches while the session is at that
+    offset and idle (or held by a writer whose lock expired), so of several
+    requests at the same offset exactly one gets the session. locked_until
+    identifies the claim when it is released.
+    """
+    supabase = get_supabase()
+    response = await execute(
+        supabase.table("upload_sessions").update({
+            "status": SESSION_RECEIVING,
+            "locked_until": locked_until
+        })
+        .eq("id", upload_id)
+        .eq("offset", offset)
+        .or_(f'status.eq.{SESSION_UPLOADING},locked_until.lt."{_now().isoformat()}"')
+    )
+    return response.data[0] if response.data else None
+
+
+async def append_chunk(session: dict, offset: int, chunks: AsyncIterator[bytes]) -> Tuple[int, bool]:
+    """
+    Append a chunk to a staged upload at the given offset
+
+    The offset is claimed in the database first, so concurrent requests on
+    any worker cannot both write at it. The chunk is streamed to disk as it
+    arrives. Writes beyond the declared upload size are rejected.
+
+    Args:
+        session: Upload session row
+        offset: Offset the client believes it is writing at (Upload-Offset header)
+        chunks: Request body stream
+
+    Returns:
+        The new offset, and whether the upload is complete and this request
+        must finish it with complete_upload() (the session is then
+        'completing', so no other request can)
+
+    Raises:
+        HTTPException: If the offset does not match the bytes received so far,
+            or another request is writing at it
+    """
+    upload_id = session["id"]
+    claim = _lock_expiry()
+    if session["status"] == SESSION_COMPLETED or await _claim(upload_id, offset, claim) is None:
+        current = await get_upload_session(upload_id, session["meeting_id"], session["user_id"])
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload-Offset mismatch: server has {current['offset']} bytes"
+        )
+
+    file_ext = os.path.splitext(session["filename"])[1].lower()
+    written = offset
+    complete = False
+    try:
+        # Drop bytes past the claimed offset left by a writer that died mid-chunk
+        os.truncate(_staging_path(upload_id), offset)
+
+        # Bytes are appended as they arrive, so if the connection drops
+        # mid-chunk everything received so far counts towards the offset
+        async with aiofiles.open(_staging_path(upload_id), "ab") as staged:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if written == 0 and detect_audio_format(chunk) != file_ext:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File content is not a valid {file_ext} audio file"
+                    )
+                if written + len(chunk) > session["size"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Chunk exceeds the declared upload size"
+                    )
+                await staged.write(chunk)
+                written += len(chunk)
+        complete = written == session["size"]
+    finally:
+        supabase = get_supabase()
+        await execute(supabase.table("upload_sessions").update({
+            "offset": written,
+            "status": SESSION_COMPLETING if complete else SESSION_UPLOADING,
+            "locked_until": _lock_expiry() if complete else None
+        }).eq("id", upload_id).eq("status", SESSION_RECEIVING).eq("locked_until", claim))
+
+    return written, complete
+
+
+async def complete_upload(session: dict) -> StoredAudio:
+    """
+    Stream a fully staged upload to storage and close the session
+
+    Only called by the request whose append_chunk() moved the session to
+    'completing'. If storing fails, the session goes back to 'uploading' at
+    its full size, so an empty PATCH at that offset retries the completion.
+
+    Args:
+        session: Upload session row whose staged bytes equal its size
+
+    Returns:
+        The stored audio
+    """
+    upload_id = session["id"]
+    file_ext = validate_audio_extension(session["filename"])
+    supabase = get_supabase()
+
+    try:
+        async with aiofiles.open(_staging_path(upload_id), "rb") as staged:
+            audio = await store_audio_stream(staged, file_ext, session["meeting_id"])
+    except BaseException:
+        await execute(supabase.table("upload_sessions").update({
+            "status": SESSION_UPLOADING,
+            "locked_until": None
+        }).eq("id", upload_id).eq("status", SESSION_COMPLETING))
+        raise
+
+    await execute(supabase.table("upload_sessions").update({
+        "status": SESSION_COMPLETED,
+        "offset": session["size"],
+        "file_path": audio.file_path,
+        "locked_until": None
+    }).eq("id", upload_id))
+
+    discard_staged_upload(upload_id)
+    return audio
+
+
+async def purge_expired_upload_sessions(batch_size: int = 100) -> int:
+    """
+    Delete expired upload sessions with their staging files and locks
+
+    Abandoned uploads would otherwise keep their partial file in
+    UPLOAD_STAGING_DIR forever.
+
+    Returns:
+        Number of sessions deleted
+    """
+    supabase = get_supabase()
+    now = datetime.now(timezone.utc).isoformat()
+
+    response = await execute(supabase.table("upload_sessions").select("id").lt("expires_at", now).limit(batch_size))
+    expired = [session["id"] for session in response.data]
+
+    for upload_id in expired:
+        discard_staged_upload(upload_id)
+
+    if expired:
+        await execute(supabase.table("upload_sessions").delete().in_("id", expired))
+
+    return len(expired)
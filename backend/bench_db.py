@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot read queries through PostgREST and direct asyncpg
+
+Usage:
+    DATABASE_URL=postgresql://... python bench_db.py <user_id> [--requests 200] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from app.core.config import settings
+from app.core.database import execute, get_supabase
+from app.core import postgres
+from app.routers.meetings import _fetch_meeting_detail
+
+
+def postgrest_queries(user_id: str, meeting_id: str) -> dict:
+    """The same hot queries, as the routers issue them through PostgREST"""
+    supabase = get_supabase()
+
+    async def user():
+        await execute(supabase.table("users").select("*").eq("id", user_id))
+
+    async def meetings():
+        await execute(supabase.table("meetings").select("*").eq("user_id", user_id).order("meeting_date", desc=True))
+
+    async def meeting_detail():
+        await _fetch_meeting_detail(meeting_id, user_id)
+
+    async def pending_actions():
+        await execute(supabase.table("action_items").select("*, meetings!inner(user_id)").eq("meetings.user_id", user_id).in_("status", ["PENDING", "APPROVED"]).order("due_date"))
+
+    return {
+        "user lookup": user,
+        "meeting list": meetings,
+        "meeting detail": meeting_detail,
+        "pending actions": pending_actions
+    }
+
+
+def asyncpg_queries(user_id: str, meeting_id: str) -> dict:
+    """The hot queries through the asyncpg pool"""
+    return {
+        "user lookup": lambda: postgres.get_user(user_id),
+        "meeting list": lambda: postgres.list_meetings(user_id),
+        "meeting detail": lambda: postgres.get_meeting_detail(meeting_id, user_id),
+        "pending actions": lambda: postgres.list_pending_actions(user_id)
+    }
+
+
+async def run(query, requests: int, concurrency: int) -> dict:
+    """Run a query `requests` times with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await query()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await query()  # Warm up connections and the statement cache
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "rps": requests / elapsed
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare PostgREST and asyncpg on the hot read paths")
+    parser.add_argument("user_id", help="User whose data is queried")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    if not settings.DATABASE_URL:
+        raise SystemExit("Set DATABASE_URL to benchmark the asyncpg path")
+
+    meetings = await execute(get_supabase().table("meetings").select("id").eq("user_id", args.user_id).limit(1))
+    if not meetings.data:
+        raise SystemExit("The user has no meetings to benchmark")
+    meeting_id = meetings.data[0]["id"]
+
+    await postgres.init_postgres()
+    try:
+        backends = {
+            "postgrest": postgrest_queries(args.user_id, meeting_id),
+            "asyncpg": asyncpg_queries(args.user_id, meeting_id)
+        }
+        print(f"{args.requests} requests per query, concurrency {args.concurrency}\n")
+        print(f"{'query':<18}{'backend':<11}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>9}")
+        for name in backends["postgrest"]:
+            for backend, queries in backends.items():
+                result = await run(queries[name], args.requests, args.concurrency)
+                print(f"{name:<18}{backend:<11}{result['p50']:>9.1f}{result['p95']:>9.1f}{result['rps']:>9.0f}")
+    finally:
+        await postgres.close_postgres()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
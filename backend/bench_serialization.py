@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization: validated response models vs trusted rows
+
+The "validated" path is what list endpoints did before: Model(**row) for
+each row, then FastAPI's response_model validation and serialization, then
+stdlib json. The "rows" path projects the rows with RowSerializer and
+encodes them with orjson (or stdlib json when orjson is not installed).
+No database is needed; rows are generated in the shape PostgREST returns.
+
+Usage:
+    python bench_serialization.py [--items 500] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core import serialization
+from app.core.serialization import RowSerializer
+from app.models.meeting import ActionItemResponse, MeetingDetailResponse, MeetingResponse
+
+TIMESTAMP = "2024-05-14T09:30:00.123456+00:00"
+
+
+def action_row(index: int, meeting_id: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "meeting_id": meeting_id,
+        "description": f"Send the revised Q3 budget to finance and confirm the numbers ({index})",
+        "action_type": "Email",
+        "assigned_to": "alex@example.com",
+        "due_date": "2024-05-21",
+        "status": "PENDING",
+        "project_id": None,
+        "confidence_score": 0.87,
+        "metadata": {"recipients": ["finance@example.com"]},
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP
+    }
+
+
+def meeting_row(index: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "project_id": str(uuid.uuid4()),
+        "title": f"Weekly planning {index}",
+        "meeting_date": "2024-05-14",
+        "meeting_time": "09:30:00",
+        "meeting_type": "Planning",
+        "attendees": ["alex@example.com", "sam@example.com", "kim@example.com"],
+        "source": "Zoom",
+        "calendar_event_id": None,
+        "summary": "Reviewed the Q3 budget and agreed on hiring priorities. " * 4,
+        "status": "Completed",
+        "audio_file_path": None,
+        "audio_file_url": None,
+        "audio_file_size": None,
+        "audio_file_sha256": None,
+        "audio_original_size": None,
+        "audio_compression_ratio": None,
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP
+    }
+
+
+def detail_row(items: int) -> dict:
+    meeting = meeting_row(0)
+    meeting.update({
+        "project_name": "Finance",
+        "project_color": "#3B82F6",
+        "transcript": {
+            "id": str(uuid.uuid4()),
+            "meeting_id": meeting["id"],
+            "raw_transcript": "So the first thing on the agenda is the budget. " * 400,
+            "cleaned_transcript": "The first item on the agenda is the budget. " * 400,
+            "transcription_status": "completed",
+            "error_message": None,
+            "created_at": TIMESTAMP,
+            "updated_at": TIMESTAMP
+        },
+        "decisions": [],
+        "action_items": [action_row(i, meeting["id"]) for i in range(items)],
+        "follow_ups": [],
+        "problem_statements": []
+    })
+    return meeting
+
+
+async def validated(model, rows) -> bytes:
+    """Model(**row), then response_model validation and serialization, then stdlib json"""
+    annotation = List[model] if isinstance(rows, list) else model
+    field = create_model_field(name="Response", type_=annotation, mode="serialization")
+    content = [model(**row) for row in rows] if isinstance(rows, list) else model(**rows)
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(content=serialized).body
+
+
+def trusted(serializer: RowSerializer, rows) -> bytes:
+    """RowSerializer projection, then orjson (or stdlib json without it)"""
+    return serializer.response(rows).body
+
+
+def trusted_stdlib(serializer: RowSerializer, rows) -> bytes:
+    """RowSerializer projection, then stdlib json"""
+    return json.dumps(serializer.project(rows), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def timed(run, repeat: int) -> float:
+    """Best wall time of `repeat` runs, in ms (run may be sync or async)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        if asyncio.iscoroutine(result):
+            await result
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare validated and trusted-row response serialization")
+    parser.add_argument("--items", type=int, default=500, help="Rows per list response")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    meeting_id = str(uuid.uuid4())
+    cases = {
+        "action list": (ActionItemResponse, [action_row(i, meeting_id) for i in range(args.items)], args.items),
+        "meeting list": (MeetingResponse, [meeting_row(i) for i in range(args.items)], args.items),
+        "meeting detail": (MeetingDetailResponse, detail_row(args.items), args.items)
+    }
+
+    encoder = "orjson" if serialization.orjson is not None else "json (orjson not installed)"
+    print(f"{args.items} items per response, best of {args.repeat}; rows encoded with {encoder}\n")
+    print(f"{'response':<16}{'path':<16}{'total ms':>10}{'us/item':>10}{'speedup':>9}")
+    for name, (model, rows, items) in cases.items():
+        serializer = RowSerializer(model)
+        paths = {
+            "validated": lambda: validated(model, rows),
+            "rows + json": lambda: trusted_stdlib(serializer, rows),
+            "rows + " + ("orjson" if serialization.orjson is not None else "json"): lambda: trusted(serializer, rows)
+        }
+        baseline = None
+        for path, run in paths.items():
+            elapsed = await timed(run, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{name:<16}{path:<16}{elapsed:>10.2f}{elapsed / items * 1000:>10.1f}{baseline / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
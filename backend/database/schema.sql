@@ -39,6 +39,12 @@ CREATE TABLE IF NOT EXISTS meetings (
     status VARCHAR(50) DEFAULT 'Scheduled', -- 'Scheduled' or 'Completed'
     audio_file_path VARCHAR(500),
     audio_file_url TEXT,
+    audio_file_size BIGINT, -- Bytes stored (after transcoding; audio_original_size is the upload)
+    audio_file_sha256 VARCHAR(64), -- Hex SHA-256 of the stored audio (the transcoded copy, if any)
+    audio_original_size BIGINT, -- Bytes uploaded, before transcoding
+    audio_compression_ratio DECIMAL(6, 2), -- audio_original_size / audio_file_size
+    audio_original_path VARCHAR(500), -- Retained original upload, if any
+    audio_original_expires_at TIMESTAMP WITH TIME ZONE,
     summary TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -52,6 +58,7 @@ CREATE TABLE IF NOT EXISTS transcripts (
     cleaned_transcript TEXT,
     transcription_status VARCHAR(50) DEFAULT 'pending', -- 'pending', 'processing', 'completed', 'failed'
     error_message TEXT,
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', COALESCE(cleaned_transcript, ''))) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -62,6 +69,7 @@ CREATE TABLE IF NOT EXISTS decisions (
     meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
     decision_text TEXT NOT NULL,
     confidence_score DECIMAL(3, 2),
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', decision_text)) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -77,6 +85,7 @@ CREATE TABLE IF NOT EXISTS action_items (
     status VARCHAR(50) DEFAULT 'PENDING', -- 'PENDING', 'APPROVED', 'REJECTED', 'EXECUTED', 'COMPLETED'
     confidence_score DECIMAL(3, 2),
     metadata JSONB, -- Store additional data like email content, meeting details
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', description)) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -99,6 +108,7 @@ CREATE TABLE IF NOT EXISTS problem_statements (
     meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
     statement TEXT NOT NULL,
     confidence_score DECIMAL(3, 2),
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', statement)) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -116,32 +126,161 @@ CREATE TABLE IF NOT EXISTS email_drafts (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- audit_log before monthly partitioning: set it aside so the partitioned
+-- table below can be created; its rows are moved in once the partition
+-- functions exist (see the end of this file)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'audit_log' AND relkind = 'r') THEN
+        ALTER TABLE audit_log RENAME TO audit_log_unpartitioned;
+        ALTER TABLE audit_log_unpartitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_unpartitioned_pkey;
+        ALTER TABLE audit_log_unpartitioned RENAME CONSTRAINT audit_log_user_id_fkey TO audit_log_unpartitioned_user_id_fkey;
+        DROP INDEX IF EXISTS idx_audit_log_user_id;
+        DROP INDEX IF EXISTS idx_audit_log_entity;
+    END IF;
+END;
+$$;
+
 -- Audit Log table (for approval workflow tracking)
+-- Partitioned by month (audit_log_pYYYY_MM, created by ensure_audit_log_partitions);
+-- rows outside every monthly partition land in audit_log_default
 CREATE TABLE IF NOT EXISTS audit_log (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     entity_type VARCHAR(50) NOT NULL, -- 'action_item', 'decision', 'follow_up'
     entity_id UUID NOT NULL,
     action VARCHAR(50) NOT NULL, -- 'APPROVED', 'REJECTED', 'EDITED', 'EXECUTED', 'COMPLETED'
     previous_value JSONB,
     new_value JSONB,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT;
+
+-- Audit Log Summary table (monthly counts kept when old audit partitions are compacted)
+CREATE TABLE IF NOT EXISTS audit_log_summary (
+    month DATE NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    entity_type VARCHAR(50) NOT NULL,
+    action VARCHAR(50) NOT NULL,
+    event_count BIGINT NOT NULL,
+    first_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (month, user_id, entity_type, action)
+);
+
+-- Upload Sessions table (resumable chunked audio uploads)
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    filename VARCHAR(255) NOT NULL,
+    size BIGINT NOT NULL,
+    "offset" BIGINT NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'uploading', -- 'uploading', 'receiving', 'completing' or 'completed'
+    locked_until TIMESTAMP WITH TIME ZONE, -- Claim of the request receiving or completing the upload
+    file_path VARCHAR(500), -- Storage path once assembled
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Idempotency Keys table (replay of retried POST requests)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(64) PRIMARY KEY, -- SHA-256 of user, endpoint and Idempotency-Key header
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    request_hash VARCHAR(64), -- SHA-256 of method, path and body; a reused key must match it
+    state VARCHAR(20) NOT NULL DEFAULT 'in_progress', -- 'in_progress' or 'completed'
+    status_code INTEGER,
+    response JSONB,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Meeting Detail Cache table (DETAIL_CACHE_BACKEND=database; serialized
+-- GET /api/meetings/{id} responses). Writes clear body and bump version, and
+-- a body is only stored if version is unchanged since the read that missed
+-- (see the functions below). Unlogged: losing it on a crash only costs cache
+-- misses.
+CREATE UNLOGGED TABLE IF NOT EXISTS meeting_detail_cache (
+    meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    body TEXT,
+    version BIGINT NOT NULL DEFAULT 0,
+    cached_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (meeting_id, user_id)
+);
+
+-- Dashboard Counters table (per-user counts kept current by triggers)
+-- counter / scope: 'action_items' / status, 'follow_ups' / status, 'meetings' / '',
+-- 'meetings_week' / week start (YYYY-MM-DD, Monday), 'project_meetings' / project ID
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    counter VARCHAR(50) NOT NULL,
+    scope VARCHAR(50) NOT NULL DEFAULT '',
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, counter, scope)
+);
+
+-- Upgrades for databases created from an earlier version of this schema
+-- (run before the indexes and functions below, which use the new columns)
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_file_size BIGINT;
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_file_sha256 VARCHAR(64);
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_original_size BIGINT;
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_compression_ratio DECIMAL(6, 2);
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_original_path VARCHAR(500);
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS audio_original_expires_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE upload_sessions ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP WITH TIME ZONE;
+ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS request_hash VARCHAR(64);
+
+-- Transition functions before the p_write_audit parameter was added
+DROP FUNCTION IF EXISTS transition_action_items(UUID[], UUID, TEXT[], TEXT);
+DROP FUNCTION IF EXISTS transition_follow_ups(UUID[], UUID, TEXT[], TEXT);
+DROP FUNCTION IF EXISTS review_action_items(UUID, UUID[], TEXT[], JSONB);
+
+-- Full-text search vectors
+ALTER TABLE transcripts ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(cleaned_transcript, ''))) STORED;
+ALTER TABLE decisions ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', decision_text)) STORED;
+ALTER TABLE action_items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', description)) STORED;
+ALTER TABLE problem_statements ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', statement)) STORED;
+
 -- Create indexes for better query performance
-CREATE INDEX idx_projects_user_id ON projects(user_id);
-CREATE INDEX idx_meetings_user_id ON meetings(user_id);
-CREATE INDEX idx_meetings_project_id ON meetings(project_id);
-CREATE INDEX idx_meetings_date ON meetings(meeting_date);
-CREATE INDEX idx_transcripts_meeting_id ON transcripts(meeting_id);
-CREATE INDEX idx_decisions_meeting_id ON decisions(meeting_id);
-CREATE INDEX idx_action_items_meeting_id ON action_items(meeting_id);
-CREATE INDEX idx_action_items_status ON action_items(status);
-CREATE INDEX idx_follow_ups_meeting_id ON follow_ups(meeting_id);
-CREATE INDEX idx_problem_statements_meeting_id ON problem_statements(meeting_id);
-CREATE INDEX idx_email_drafts_meeting_id ON email_drafts(meeting_id);
-CREATE INDEX idx_audit_log_user_id ON audit_log(user_id);
-CREATE INDEX idx_audit_log_entity ON audit_log(entity_type, entity_id);
+CREATE INDEX IF NOT EXISTS idx_projects_user_id ON projects(user_id);
+CREATE INDEX IF NOT EXISTS idx_meetings_user_id ON meetings(user_id);
+CREATE INDEX IF NOT EXISTS idx_meetings_project_id ON meetings(project_id);
+CREATE INDEX IF NOT EXISTS idx_meetings_date ON meetings(meeting_date);
+CREATE INDEX IF NOT EXISTS idx_meetings_audio_original_expires_at ON meetings(audio_original_expires_at) WHERE audio_original_path IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_transcripts_meeting_id ON transcripts(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_meeting_id ON decisions(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_action_items_meeting_id ON action_items(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_action_items_status ON action_items(status);
+CREATE INDEX IF NOT EXISTS idx_follow_ups_meeting_id ON follow_ups(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_problem_statements_meeting_id ON problem_statements(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_email_drafts_meeting_id ON email_drafts(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_user_id ON audit_log(user_id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_entity ON audit_log(entity_type, entity_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_meeting_id ON upload_sessions(meeting_id);
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_expires_at ON upload_sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS idx_meeting_detail_cache_user_id ON meeting_detail_cache(user_id);
+
+-- Keyset pagination: one index per list ordering, with id as tie-breaker
+CREATE INDEX IF NOT EXISTS idx_projects_user_created ON projects(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_meetings_user_date ON meetings(user_id, meeting_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_action_items_meeting_created ON action_items(meeting_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_action_items_status_due ON action_items(status, due_date, id);
+CREATE INDEX IF NOT EXISTS idx_follow_ups_meeting_created ON follow_ups(meeting_id, created_at DESC, id DESC);
+
+-- Full-text search (search_meetings)
+CREATE INDEX IF NOT EXISTS idx_transcripts_search ON transcripts USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_decisions_search ON decisions USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_action_items_search ON action_items USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_problem_statements_search ON problem_statements USING GIN (search_vector);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -153,23 +292,533 @@ END;
 $$ language 'plpgsql';
 
 -- Apply updated_at triggers
-CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
+CREATE OR REPLACE TRIGGER update_users_updated_at BEFORE UPDATE ON users
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
-CREATE TRIGGER update_projects_updated_at BEFORE UPDATE ON projects
+CREATE OR REPLACE TRIGGER update_projects_updated_at BEFORE UPDATE ON projects
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
-CREATE TRIGGER update_meetings_updated_at BEFORE UPDATE ON meetings
+CREATE OR REPLACE TRIGGER update_meetings_updated_at BEFORE UPDATE ON meetings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
-CREATE TRIGGER update_transcripts_updated_at BEFORE UPDATE ON transcripts
+CREATE OR REPLACE TRIGGER update_transcripts_updated_at BEFORE UPDATE ON transcripts
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
-CREATE TRIGGER update_action_items_updated_at BEFORE UPDATE ON action_items
+CREATE OR REPLACE TRIGGER update_action_items_updated_at BEFORE UPDATE ON action_items
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
-CREATE TRIGGER update_follow_ups_updated_at BEFORE UPDATE ON follow_ups
+CREATE OR REPLACE TRIGGER update_follow_ups_updated_at BEFORE UPDATE ON follow_ups
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
-CREATE TRIGGER update_email_drafts_updated_at BEFORE UPDATE ON email_drafts
+CREATE OR REPLACE TRIGGER update_email_drafts_updated_at BEFORE UPDATE ON email_drafts
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE TRIGGER update_upload_sessions_updated_at BEFORE UPDATE ON upload_sessions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Dashboard counters. Every insert, delete and counted change of meetings,
+-- action items and follow-ups adjusts the owner's counters, so reading the
+-- dashboard never scans the underlying tables.
+CREATE OR REPLACE FUNCTION bump_dashboard_counter(p_user_id UUID, p_counter TEXT, p_scope TEXT, p_delta BIGINT)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_user_id IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+
+    IF p_delta < 0 THEN
+        -- Only ever decrement existing rows: while a user is being deleted,
+        -- inserting a row for them would violate the foreign key
+        UPDATE dashboard_counters SET value = value + p_delta
+        WHERE user_id = p_user_id AND counter = p_counter AND scope = COALESCE(p_scope, '');
+    ELSE
+        INSERT INTO dashboard_counters (user_id, counter, scope, value)
+        VALUES (p_user_id, p_counter, COALESCE(p_scope, ''), p_delta)
+        ON CONFLICT (user_id, counter, scope) DO UPDATE SET value = dashboard_counters.value + EXCLUDED.value;
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION bump_meeting_counters(p_meeting meetings, p_delta BIGINT)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM bump_dashboard_counter(p_meeting.user_id, 'meetings', '', p_delta);
+    PERFORM bump_dashboard_counter(
+        p_meeting.user_id, 'meetings_week', to_char(date_trunc('week', p_meeting.meeting_date), 'YYYY-MM-DD'), p_delta
+    );
+    IF p_meeting.project_id IS NOT NULL THEN
+        PERFORM bump_dashboard_counter(p_meeting.user_id, 'project_meetings', p_meeting.project_id::text, p_delta);
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_meeting_changes()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_status RECORD;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        -- Runs before the delete, while the meeting's items still exist: their
+        -- own triggers cannot find the meeting's owner once it is gone
+        PERFORM bump_meeting_counters(OLD, -1);
+        FOR v_status IN SELECT status, COUNT(*) AS n FROM action_items WHERE meeting_id = OLD.id GROUP BY status LOOP
+            PERFORM bump_dashboard_counter(OLD.user_id, 'action_items', v_status.status, -v_status.n);
+        END LOOP;
+        FOR v_status IN SELECT status, COUNT(*) AS n FROM follow_ups WHERE meeting_id = OLD.id GROUP BY status LOOP
+            PERFORM bump_dashboard_counter(OLD.user_id, 'follow_ups', v_status.status, -v_status.n);
+        END LOOP;
+        RETURN OLD;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM bump_meeting_counters(OLD, -1);
+    END IF;
+    PERFORM bump_meeting_counters(NEW, 1);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_meeting_item_changes()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- TG_TABLE_NAME is the counter name ('action_items' or 'follow_ups'). The
+    -- owner lookup finds nothing for items deleted along with their meeting,
+    -- which count_meeting_changes has already subtracted.
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_dashboard_counter(
+            (SELECT user_id FROM meetings WHERE id = OLD.meeting_id), TG_TABLE_NAME, OLD.status, -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_dashboard_counter(
+            (SELECT user_id FROM meetings WHERE id = NEW.meeting_id), TG_TABLE_NAME, NEW.status, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER count_meetings_insert AFTER INSERT ON meetings
+    FOR EACH ROW EXECUTE FUNCTION count_meeting_changes();
+
+CREATE OR REPLACE TRIGGER count_meetings_update AFTER UPDATE OF user_id, project_id, meeting_date ON meetings
+    FOR EACH ROW
+    WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id
+          OR OLD.project_id IS DISTINCT FROM NEW.project_id
+          OR OLD.meeting_date IS DISTINCT FROM NEW.meeting_date)
+    EXECUTE FUNCTION count_meeting_changes();
+
+CREATE OR REPLACE TRIGGER count_meetings_delete BEFORE DELETE ON meetings
+    FOR EACH ROW EXECUTE FUNCTION count_meeting_changes();
+
+CREATE OR REPLACE TRIGGER count_action_items AFTER INSERT OR DELETE ON action_items
+    FOR EACH ROW EXECUTE FUNCTION count_meeting_item_changes();
+
+CREATE OR REPLACE TRIGGER count_action_items_update AFTER UPDATE OF status, meeting_id ON action_items
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.meeting_id IS DISTINCT FROM NEW.meeting_id)
+    EXECUTE FUNCTION count_meeting_item_changes();
+
+CREATE OR REPLACE TRIGGER count_follow_ups AFTER INSERT OR DELETE ON follow_ups
+    FOR EACH ROW EXECUTE FUNCTION count_meeting_item_changes();
+
+CREATE OR REPLACE TRIGGER count_follow_ups_update AFTER UPDATE OF status, meeting_id ON follow_ups
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.meeting_id IS DISTINCT FROM NEW.meeting_id)
+    EXECUTE FUNCTION count_meeting_item_changes();
+
+-- Recount everything from scratch (initial fill, or repair after bulk loads
+-- with triggers disabled)
+CREATE OR REPLACE FUNCTION rebuild_dashboard_counters()
+RETURNS VOID
+LANGUAGE sql AS $$
+    DELETE FROM dashboard_counters;
+    INSERT INTO dashboard_counters (user_id, counter, scope, value)
+    SELECT user_id, 'meetings', '', COUNT(*) FROM meetings GROUP BY user_id
+    UNION ALL
+    SELECT user_id, 'meetings_week', to_char(date_trunc('week', meeting_date), 'YYYY-MM-DD'), COUNT(*)
+    FROM meetings GROUP BY 1, 2, 3
+    UNION ALL
+    SELECT user_id, 'project_meetings', project_id::text, COUNT(*)
+    FROM meetings WHERE project_id IS NOT NULL GROUP BY 1, 2, 3
+    UNION ALL
+    SELECT m.user_id, 'action_items', COALESCE(a.status, ''), COUNT(*)
+    FROM action_items a JOIN meetings m ON m.id = a.meeting_id GROUP BY 1, 2, 3
+    UNION ALL
+    SELECT m.user_id, 'follow_ups', COALESCE(f.status, ''), COUNT(*)
+    FROM follow_ups f JOIN meetings m ON m.id = f.meeting_id GROUP BY 1, 2, 3;
+$$;
+
+-- Conditional status transitions (called through PostgREST RPC).
+-- Rows are only changed if they belong to one of the user's meetings and are
+-- in one of the expected states. Rows are locked before their state is
+-- checked, so concurrent transitions of the same row cannot both succeed.
+-- With p_write_audit the audit rows are written by the same statement;
+-- otherwise the caller records them from the returned previous states.
+CREATE OR REPLACE FUNCTION transition_action_items(
+    p_ids UUID[], p_user_id UUID, p_from_states TEXT[], p_to_state TEXT,
+    p_write_audit BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (previous_status TEXT, action_item JSONB)
+LANGUAGE sql AS $$
+    WITH target AS (
+        SELECT a.id, a.status AS previous_status
+        FROM action_items a
+        JOIN meetings m ON m.id = a.meeting_id
+        WHERE a.id = ANY(p_ids) AND m.user_id = p_user_id AND a.status = ANY(p_from_states)
+        FOR UPDATE OF a
+    ), updated AS (
+        UPDATE action_items a SET status = p_to_state
+        FROM target t
+        WHERE a.id = t.id
+        RETURNING a.*
+    ), audit AS (
+        INSERT INTO audit_log (user_id, entity_type, entity_id, action, previous_value, new_value)
+        SELECT p_user_id, 'action_item', t.id, p_to_state,
+               jsonb_build_object('status', t.previous_status), jsonb_build_object('status', p_to_state)
+        FROM target t
+        JOIN updated u ON u.id = t.id
+        WHERE p_write_audit
+    )
+    SELECT t.previous_status, to_jsonb(u.*)
+    FROM updated u
+    JOIN target t ON t.id = u.id;
+$$;
+
+CREATE OR REPLACE FUNCTION transition_follow_ups(
+    p_ids UUID[], p_user_id UUID, p_from_states TEXT[], p_to_state TEXT,
+    p_write_audit BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (previous_status TEXT, follow_up JSONB)
+LANGUAGE sql AS $$
+    WITH target AS (
+        SELECT f.id, f.status AS previous_status
+        FROM follow_ups f
+        JOIN meetings m ON m.id = f.meeting_id
+        WHERE f.id = ANY(p_ids) AND m.user_id = p_user_id AND f.status = ANY(p_from_states)
+        FOR UPDATE OF f
+    ), updated AS (
+        UPDATE follow_ups f SET status = p_to_state
+        FROM target t
+        WHERE f.id = t.id
+        RETURNING f.*
+    ), audit AS (
+        INSERT INTO audit_log (user_id, entity_type, entity_id, action, previous_value, new_value)
+        SELECT p_user_id, 'follow_up', t.id, UPPER(p_to_state),
+               jsonb_build_object('status', t.previous_status), jsonb_build_object('status', p_to_state)
+        FROM target t
+        JOIN updated u ON u.id = t.id
+        WHERE p_write_audit
+    )
+    SELECT t.previous_status, to_jsonb(u.*)
+    FROM updated u
+    JOIN target t ON t.id = u.id;
+$$;
+
+-- Bulk review: each requested item moves to its own target state. Ownership
+-- and current states are read with one locking query, every qualifying item
+-- is changed by one UPDATE and all audit rows are written by one INSERT
+-- (unless p_write_audit is false, as above).
+-- p_allowed maps each target state to the states it can be reached from.
+CREATE OR REPLACE FUNCTION review_action_items(
+    p_user_id UUID, p_ids UUID[], p_to_states TEXT[], p_allowed JSONB,
+    p_write_audit BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (action_item_id UUID, outcome TEXT, previous_status TEXT, action_item JSONB)
+LANGUAGE sql AS $$
+    WITH requested AS (
+        SELECT r.id, r.to_state
+        FROM unnest(p_ids, p_to_states) AS r(id, to_state)
+    ), owned AS (
+        SELECT a.id, a.status AS previous_status, r.to_state
+        FROM action_items a
+        JOIN meetings m ON m.id = a.meeting_id
+        JOIN requested r ON r.id = a.id
+        WHERE m.user_id = p_user_id
+        FOR UPDATE OF a
+    ), eligible AS (
+        SELECT o.* FROM owned o
+        WHERE (p_allowed -> o.to_state) ? o.previous_status
+    ), updated AS (
+        UPDATE action_items a SET status = e.to_state
+        FROM eligible e
+        WHERE a.id = e.id
+        RETURNING a.*
+    ), audit AS (
+        INSERT INTO audit_log (user_id, entity_type, entity_id, action, previous_value, new_value)
+        SELECT p_user_id, 'action_item', e.id, e.to_state,
+               jsonb_build_object('status', e.previous_status), jsonb_build_object('status', e.to_state)
+        FROM eligible e
+        JOIN updated u ON u.id = e.id
+        WHERE p_write_audit
+    )
+    SELECT r.id,
+           CASE WHEN u.id IS NOT NULL THEN 'updated'
+                WHEN o.id IS NULL THEN 'not_found'
+                ELSE 'invalid_state' END,
+           o.previous_status,
+           to_jsonb(u.*)
+    FROM requested r
+    LEFT JOIN owned o ON o.id = r.id
+    LEFT JOIN updated u ON u.id = r.id;
+$$;
+
+-- Ranked full-text search over a user's transcripts, decisions, action items
+-- and problem statements (called through PostgREST RPC). Matches are ranked
+-- with the stored search vectors; snippets are only built for the returned
+-- page, since ts_headline re-parses the text. Pages continue strictly after
+-- the (rank, id) of the last result of the previous page.
+CREATE OR REPLACE FUNCTION search_meetings(
+    p_user_id UUID, p_query TEXT, p_limit INTEGER DEFAULT 20,
+    p_after_rank REAL DEFAULT NULL, p_after_id UUID DEFAULT NULL
+) RETURNS TABLE (
+    source TEXT, id UUID, meeting_id UUID, meeting_title TEXT, meeting_date DATE, rank REAL, snippet TEXT
+)
+LANGUAGE sql STABLE AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', p_query) AS q
+    ), matches AS (
+        SELECT 'transcript' AS source, t.id, t.meeting_id, ts_rank(t.search_vector, query.q) AS rank
+        FROM transcripts t JOIN meetings m ON m.id = t.meeting_id, query
+        WHERE m.user_id = p_user_id AND t.search_vector @@ query.q
+        UNION ALL
+        SELECT 'decision', d.id, d.meeting_id, ts_rank(d.search_vector, query.q)
+        FROM decisions d JOIN meetings m ON m.id = d.meeting_id, query
+        WHERE m.user_id = p_user_id AND d.search_vector @@ query.q
+        UNION ALL
+        SELECT 'action_item', a.id, a.meeting_id, ts_rank(a.search_vector, query.q)
+        FROM action_items a JOIN meetings m ON m.id = a.meeting_id, query
+        WHERE m.user_id = p_user_id AND a.search_vector @@ query.q
+        UNION ALL
+        SELECT 'problem_statement', ps.id, ps.meeting_id, ts_rank(ps.search_vector, query.q)
+        FROM problem_statements ps JOIN meetings m ON m.id = ps.meeting_id, query
+        WHERE m.user_id = p_user_id AND ps.search_vector @@ query.q
+    ), page AS (
+        SELECT * FROM matches mt
+        WHERE p_after_id IS NULL OR (mt.rank, mt.id) < (p_after_rank, p_after_id)
+        ORDER BY mt.rank DESC, mt.id DESC
+        LIMIT p_limit
+    )
+    SELECT p.source, p.id, p.meeting_id, m.title::text, m.meeting_date, p.rank,
+           ts_headline('english',
+               CASE p.source
+                   WHEN 'transcript' THEN (SELECT cleaned_transcript FROM transcripts WHERE transcripts.id = p.id)
+                   WHEN 'decision' THEN (SELECT decision_text FROM decisions WHERE decisions.id = p.id)
+                   WHEN 'action_item' THEN (SELECT description FROM action_items WHERE action_items.id = p.id)
+                   ELSE (SELECT statement FROM problem_statements WHERE problem_statements.id = p.id)
+               END,
+               query.q,
+               'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2'
+           )
+    FROM page p
+    JOIN meetings m ON m.id = p.meeting_id, query
+    ORDER BY p.rank DESC, p.id DESC;
+$$;
+
+-- Meeting detail cache (called through PostgREST RPC). A read creates the
+-- meeting's row if needed and returns its version with any unexpired body; a
+-- fill only stores the body if no invalidation has bumped the version since,
+-- so a worker that fetched the meeting before another worker's write cannot
+-- overwrite the invalidation with stale data.
+CREATE OR REPLACE FUNCTION read_meeting_detail_cache(p_meeting_id UUID, p_user_id UUID, p_ttl_seconds INTEGER)
+RETURNS TABLE (body TEXT, cached_at TIMESTAMP WITH TIME ZONE, version BIGINT)
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO meeting_detail_cache (meeting_id, user_id)
+    SELECT m.id, m.user_id FROM meetings m WHERE m.id = p_meeting_id AND m.user_id = p_user_id
+    ON CONFLICT (meeting_id, user_id) DO NOTHING;
+
+    RETURN QUERY
+    SELECT CASE WHEN c.cached_at > NOW() - make_interval(secs => p_ttl_seconds) THEN c.body END,
+           c.cached_at, c.version
+    FROM meeting_detail_cache c
+    WHERE c.meeting_id = p_meeting_id AND c.user_id = p_user_id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION fill_meeting_detail_cache(p_meeting_id UUID, p_user_id UUID, p_body TEXT, p_version BIGINT)
+RETURNS BOOLEAN
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE meeting_detail_cache
+    SET body = p_body, cached_at = NOW()
+    WHERE meeting_id = p_meeting_id AND user_id = p_user_id AND version = p_version;
+    RETURN FOUND;
+END;
+$$;
+
+-- p_meeting_id NULL invalidates all of the user's meetings
+CREATE OR REPLACE FUNCTION invalidate_meeting_detail_cache(p_user_id UUID, p_meeting_id UUID DEFAULT NULL)
+RETURNS VOID
+LANGUAGE sql AS $$
+    UPDATE meeting_detail_cache
+    SET body = NULL, version = version + 1
+    WHERE user_id = p_user_id AND (p_meeting_id IS NULL OR meeting_id = p_meeting_id);
+$$;
+
+-- Audit log partition maintenance. Each month gets its own partition, created
+-- ahead of time so inserts never have to wait for DDL; indexes created on
+-- audit_log apply to every partition.
+-- Creating and dropping partitions requires owning audit_log, which the API's
+-- role does not, so these functions run as their owner (SECURITY DEFINER,
+-- with a fixed search_path) and only the service role may call them (see the
+-- grants below).
+CREATE OR REPLACE FUNCTION create_audit_log_partition(p_month DATE)
+RETURNS VOID
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::date;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    v_name TEXT := 'audit_log_p' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    -- A new partition cannot be attached while the default partition holds
+    -- rows of its range, so move them out and back in
+    CREATE TEMP TABLE audit_log_moved (LIKE audit_log) ON COMMIT DROP;
+    WITH moved AS (
+        DELETE FROM audit_log_default
+        WHERE created_at >= v_start AND created_at < v_end
+        RETURNING *
+    )
+    INSERT INTO audit_log_moved SELECT * FROM moved;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+
+    INSERT INTO audit_log SELECT * FROM audit_log_moved;
+    DROP TABLE audit_log_moved;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION ensure_audit_log_partitions(p_months_ahead INTEGER DEFAULT 2)
+RETURNS VOID
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp AS $$
+BEGIN
+    FOR i IN 0..p_months_ahead LOOP
+        PERFORM create_audit_log_partition((CURRENT_DATE + make_interval(months => i))::date);
+    END LOOP;
+END;
+$$;
+
+-- Retention: monthly partitions older than p_retain_months are dropped, after
+-- their rows are folded into audit_log_summary when p_summarize is set.
+-- Dropping a whole partition is cheap and leaves no dead rows behind.
+CREATE OR REPLACE FUNCTION compact_audit_log(p_retain_months INTEGER, p_summarize BOOLEAN DEFAULT TRUE)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp AS $$
+DECLARE
+    v_cutoff DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_retain_months))::date;
+    v_partition TEXT;
+    v_compacted INTEGER := 0;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'audit_log'::regclass
+          AND c.relname ~ '^audit_log_p[0-9]{4}_[0-9]{2}$'
+          AND to_date(substring(c.relname FROM 12), 'YYYY_MM') < v_cutoff
+        ORDER BY c.relname
+    LOOP
+        IF p_summarize THEN
+            EXECUTE format(
+                'INSERT INTO audit_log_summary (month, user_id, entity_type, action, event_count, first_at, last_at)
+                 SELECT date_trunc(''month'', created_at)::date, user_id, entity_type, action,
+                        COUNT(*), MIN(created_at), MAX(created_at)
+                 FROM %I
+                 GROUP BY 1, 2, 3, 4
+                 ON CONFLICT (month, user_id, entity_type, action) DO UPDATE SET
+                     event_count = audit_log_summary.event_count + EXCLUDED.event_count,
+                     first_at = LEAST(audit_log_summary.first_at, EXCLUDED.first_at),
+                     last_at = GREATEST(audit_log_summary.last_at, EXCLUDED.last_at)',
+                v_partition
+            );
+        END IF;
+        EXECUTE format('DROP TABLE %I', v_partition);
+        v_compacted := v_compacted + 1;
+    END LOOP;
+    RETURN v_compacted;
+END;
+$$;
+
+-- Periodic job (called through PostgREST RPC): create upcoming partitions and
+-- apply retention. p_retain_months <= 0 keeps all history.
+CREATE OR REPLACE FUNCTION maintain_audit_log(p_retain_months INTEGER DEFAULT 0, p_summarize BOOLEAN DEFAULT TRUE)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp AS $$
+BEGIN
+    PERFORM ensure_audit_log_partitions();
+    IF p_retain_months <= 0 THEN
+        RETURN 0;
+    END IF;
+    RETURN compact_audit_log(p_retain_months, p_summarize);
+END;
+$$;
+
+-- Functions run as their owner by default are executable by everyone,
+-- including Supabase's anon and authenticated roles; keep them to the
+-- service role the API uses.
+REVOKE EXECUTE ON FUNCTION create_audit_log_partition(DATE) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION ensure_audit_log_partitions(INTEGER) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION compact_audit_log(INTEGER, BOOLEAN) FROM PUBLIC;
+REVOKE EXECUTE ON FUNCTION maintain_audit_log(INTEGER, BOOLEAN) FROM PUBLIC;
+DO $$
+DECLARE
+    v_role TEXT;
+BEGIN
+    FOREACH v_role IN ARRAY ARRAY['anon', 'authenticated'] LOOP
+        IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = v_role) THEN
+            EXECUTE format('REVOKE EXECUTE ON FUNCTION create_audit_log_partition(DATE), ensure_audit_log_partitions(INTEGER), compact_audit_log(INTEGER, BOOLEAN), maintain_audit_log(INTEGER, BOOLEAN) FROM %I', v_role);
+        END IF;
+    END LOOP;
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION maintain_audit_log(INTEGER, BOOLEAN) TO service_role;
+    END IF;
+END;
+$$;
+
+-- History of one entity. The created_at bound lets the planner skip every
+-- partition older than p_since.
+CREATE OR REPLACE FUNCTION audit_history(
+    p_entity_type TEXT, p_entity_id UUID, p_since TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP - INTERVAL '90 days'
+) RETURNS SETOF audit_log
+LANGUAGE sql STABLE AS $$
+    SELECT * FROM audit_log
+    WHERE entity_type = p_entity_type AND entity_id = p_entity_id AND created_at >= p_since
+    ORDER BY created_at DESC;
+$$;
+
+-- Rows of an audit_log set aside above: create their monthly partitions and move them in
+DO $$
+DECLARE
+    v_month DATE;
+BEGIN
+    IF to_regclass('audit_log_unpartitioned') IS NOT NULL THEN
+        FOR v_month IN
+            SELECT DISTINCT date_trunc('month', created_at)::date
+            FROM audit_log_unpartitioned
+            WHERE created_at IS NOT NULL
+        LOOP
+            PERFORM create_audit_log_partition(v_month);
+        END LOOP;
+
+        INSERT INTO audit_log (id, user_id, entity_type, entity_id, action, previous_value, new_value, created_at)
+        SELECT id, user_id, entity_type, entity_id, action, previous_value, new_value,
+               COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM audit_log_unpartitioned;
+
+        DROP TABLE audit_log_unpartitioned;
+    END IF;
+END;
+$$;
+
+SELECT ensure_audit_log_partitions();
+
+-- Dashboard counters for data that existed before they were maintained
+SELECT rebuild_dashboard_counters();